@@ -1,8 +1,38 @@
-from bisect import bisect_left
+from array import array
+import argparse
+from bisect import bisect_left, bisect_right
+import collections
+from concurrent.futures import ProcessPoolExecutor
 import copy
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import zlib
+
+# numpy is optional: when it is installed, configurations are read from whole batches of colourings at once and the graph of
+# colourings is made with bitwise tests on matrices, otherwise the same results are computed in pure Python
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # graphs are represented by a dictionary where "vertices" is range(n) with n the amount of vertices,
 # and "edges" is a list with the edges, which are sets of two vertices.
+# a colouring of a graph is a list which contains for each edge a list [edge, colour]. colourings of blocks and combinations
+# of blocks are stored as a pair [colouring, permutation], where permutation is a tuple mapping each colour to a new colour.
+# this pair stands for the colouring we get by permuting the colours of colouring, so colourings which only differ by a
+# permutation of colours share the same list and are only made explicitly by expandColouring.
+# the directed graphs of colourings are stored in compressed sparse row form: "offsets" and "targets" are arrays of machine integers,
+# where the vertices the vertex v has an edge to are targets[offsets[v]:offsets[v+1]] in increasing order. these arrays are either
+# in memory or in a file made by writeGraphFile, which is then mapped into memory.
 # below are some predefined graphs, but you can add graphs if needed.
 petersenGraph = {"vertices": range(10),
                  "edges": [{0,1}, {0,2}, {0,3}, {1,6}, {1,7}, {2,4}, {2,8}, {3,5}, {3,9}, {4,5}, {4,7}, {5,6}, {6,8},
@@ -23,11 +53,56 @@ flowerSnarkJ5 = {"vertices": range(20),
                            {5,10}, {6,9}, {6,11}, {7,8}, {7,9}, {8,12}, {9,13}, {10,14}, {11,15}, {12,13}, {12,16},
                            {13,17}, {14,15}, {14,16}, {15,17}, {16,18}, {17,19}, {18,19}]}
 
+# the predefined graphs by name, add your own graph here as well to use it from the command line
+predefinedGraphs = {"petersenGraph": petersenGraph, "firstBlanusaSnark": firstBlanusaSnark,
+                    "secondBlanusaSnark": secondBlanusaSnark, "flowerSnarkJ5": flowerSnarkJ5}
+
+# the permutation which does not change any of the 5 colours
+identityPermutation = (0, 1, 2, 3, 4)
+
+# the permutations applied to a combination of colourings of B with spokes coloured 0 to get all B^2-colourings, which swap colour 0
+# with 1 and 2, and to a combination with spokes coloured 0, 1 and 2 to get all B^3-colourings, which permute the colours 0, 1 and 2
+B2Permutations = [identityPermutation, (1, 0, 2, 3, 4), (2, 1, 0, 3, 4)]
+B3Permutations = [identityPermutation, (0, 2, 1, 3, 4), (1, 0, 2, 3, 4), (1, 2, 0, 3, 4), (2, 0, 1, 3, 4), (2, 1, 0, 3, 4)]
+
+# the amount of colours in each set of colours made by colourMask
+colourBitCount = [bin(m).count("1") for m in range(1 << 5)]
+
+# the amount of colourings whose configurations are read at once by createConfigurationMatrix, and the amount of rows of the graph
+# of colourings that are tested at once by createColouringsGraphRowsMatrix
+colouringBatchSize = 4096
+rowBlockSize = 1024
+
+# the kinds of B^2- and B^3-colourings by the colours of their spokes as given by spokeType, for which analyseBlock checks that the final
+# set contains a colouring attaching to itself, and the kinds of edges it checks the final set contains. an edge from a colouring
+# of kind "00" to one of kind "012" is of kind "00-012"
+B2SpokeTypes = ["00", "11", "22"]
+B3SpokeTypes = ["012", "021", "102", "120", "201", "210"]
+selfAdjacentClasses = B2SpokeTypes + B3SpokeTypes
+edgeClasses = ([B2SpokeTypes[i] + "-" + t for i in range(3) for t in B2SpokeTypes[i:]] + [s + "-" + t for s in B2SpokeTypes for t in B3SpokeTypes]
+               + [B3SpokeTypes[i] + "-" + t for i in range(6) for t in B3SpokeTypes[i:]])
+
+# triangleClasses[s][t] lists the kinds in selfAdjacentClasses of the colourings which have to complete a triangle with an edge
+# from a colouring of the s-th kind to one of the t-th kind for conditions (5) and (6), as checked by hasTriangles. between two
+# B^3-colourings with middle spokes coloured 0 all kinds of B^3-colourings are needed, with middle spokes coloured 0 or 1 those with
+# middle spoke coloured 1 or 2, and otherwise those with middle spoke coloured 2. every edge needs all kinds of B^2-colourings
+triangleClasses = [[([c for c in range(3, 9) if s[1] == "0" and t[1] == "0" or
+                      s[1] in "01" and t[1] in "01" and selfAdjacentClasses[c][1] in "12" or selfAdjacentClasses[c][1] == "2"]
+                     if len(s) == 3 and len(t) == 3 else []) + [0, 1, 2] for t in selfAdjacentClasses] for s in selfAdjacentClasses]
+
+# edgeClassIndex[s][t] is the position in selfAdjacentClasses + edgeClasses of the kind of an edge from a colouring of the s-th kind
+# in selfAdjacentClasses to one of the t-th kind, or -1 if analyseBlock does not check for this kind of edge
+edgeClassIndex = [[len(selfAdjacentClasses) + edgeClasses.index(s + "-" + t) if s + "-" + t in edgeClasses else -1 for t in selfAdjacentClasses]
+                  for s in selfAdjacentClasses]
+
 # Input:
 # G = a graph
 # path = a list of 3 vertices in G which form a path and which are not in a 3 or 4 cycle
 # crossed = whether the block has crossed connections
 # Output: a graph which is the block created by removing the path from G
+#         the spoke is the first edge, the left horizontal semiedges are the fourth and third to last edge, and the right
+#         horizontal semiedges, which become the connecting edges when blocks are combined, are the last two edges.
+#         these positions are stored in the graph together with the index tables added by addEdgeIndex
 def createBlock(G, path, crossed=False):
     G = copy.deepcopy(G)
     adjacency = [[],[],[]]
@@ -74,607 +149,2580 @@ def createBlock(G, path, crossed=False):
 
     G["vertices"] = range(len(G["vertices"]) + 2)
 
+    edgesAmount = len(G["edges"])
+    G["spokes"] = [0]
+    G["leftSemiedges"] = [edgesAmount-4, edgesAmount-3]
+    G["rightSemiedges"] = [edgesAmount-2, edgesAmount-1]
+    G["connectingEdges"] = []
+    G["boundaryEdges"] = G["spokes"] + G["leftSemiedges"] + G["rightSemiedges"]
+    addEdgeIndex(G)
+
+    return G
+
+# Input: a block B and the amount of blocks k
+# Output: the graph B^k of k copies of B where the right semiedges of each copy are connected to the left semiedges of the next.
+#         its edges are ordered as in the colourings made by combineBColourings: first the spokes, then the internal edges of
+#         each copy, then the connecting edges and lastly the horizontal semiedges.
+#         for each edge "memberEdges" contains the copy it belongs to and the position of the corresponding edge in B, and for each
+#         boundary edge "memberConfigurations" contains the copy it belongs to, its position in a configuration of B, and for each edge
+#         adjacent to it the position of its colour in the adjacent colours of this entry, as used by combineBConfigurations
+def createCombinedBlock(B, k):
+    BInternalVertices = len(B["vertices"]) - 5
+    spoke = B["spokes"][0]
+    left0, left1 = B["leftSemiedges"]
+    right0, right1 = B["rightSemiedges"]
+
+    edges = []
+    memberEdges = []
+    for j in range(k):
+        edges.append({min(B["edges"][spoke]) + j*BInternalVertices, k*BInternalVertices + 4 + j})
+        memberEdges.append([j, spoke])
+
+    for j in range(k):
+        for i in range(len(B["edges"])):
+            if i in B["boundaryEdges"]:
+                continue
+            e = B["edges"][i]
+            if j == 0:
+                edges.append(e)
+            else:
+                edges.append({min(e) + j*BInternalVertices, max(e) + j*BInternalVertices})
+            memberEdges.append([j, i])
+
+    connectingStart = len(edges)
+    for j in range(k-1):
+        edges.append({min(B["edges"][right0]) + j*BInternalVertices, min(B["edges"][left0]) + (j+1)*BInternalVertices})
+        memberEdges.append([j, right0])
+        edges.append({min(B["edges"][right1]) + j*BInternalVertices, min(B["edges"][left1]) + (j+1)*BInternalVertices})
+        memberEdges.append([j, right1])
+
+    edges.append({min(B["edges"][left0]), k*BInternalVertices})
+    memberEdges.append([0, left0])
+    edges.append({min(B["edges"][left1]), k*BInternalVertices + 1})
+    memberEdges.append([0, left1])
+    edges.append({min(B["edges"][right0]) + (k-1)*BInternalVertices, k*BInternalVertices + 2})
+    memberEdges.append([k-1, right0])
+    edges.append({min(B["edges"][right1]) + (k-1)*BInternalVertices, k*BInternalVertices + 3})
+    memberEdges.append([k-1, right1])
+
+    edgesAmount = len(edges)
+    G = {"vertices": range(k*BInternalVertices + 4 + k), "edges": edges, "memberEdges": memberEdges}
+    G["spokes"] = list(range(k))
+    G["leftSemiedges"] = [edgesAmount-4, edgesAmount-3]
+    G["rightSemiedges"] = [edgesAmount-2, edgesAmount-1]
+    G["connectingEdges"] = list(range(connectingStart, edgesAmount-4))
+    G["boundaryEdges"] = G["spokes"] + G["leftSemiedges"] + G["rightSemiedges"]
+    addEdgeIndex(G)
+
+#   a connecting edge belongs to the copy of its right semiedge, in the next copy it has the colour of the left semiedge
+    memberConfigurations = []
+    for i in G["boundaryEdges"]:
+        member, e = memberEdges[i]
+        adjacentPositions = []
+        for f in G["adjacentEdges"][i]:
+            fMember, f = memberEdges[f]
+            if fMember != member:
+                f = B["leftSemiedges"][B["rightSemiedges"].index(f)]
+            adjacentPositions.append(B["adjacentEdges"][e].index(f))
+        memberConfigurations.append([member, B["boundaryEdges"].index(e), adjacentPositions])
+    G["memberConfigurations"] = memberConfigurations
+
     return G
 
+# Input: a graph G
+# Output: none, G gets two index tables: "incidentEdges" contains for each vertex the positions of the edges incident with it,
+#         and "adjacentEdges" contains for each edge the positions of the edges adjacent to it, ordered by the end they share
+#         and then by position
+def addEdgeIndex(G):
+    incidentEdges = []
+    for v in G["vertices"]:
+        incidentEdges.append([])
+    for i in range(len(G["edges"])):
+        for v in G["edges"][i]:
+            incidentEdges[v].append(i)
+
+    adjacentEdges = []
+    for i in range(len(G["edges"])):
+        adjacentEdges.append([])
+        for v in G["edges"][i]:
+            for j in incidentEdges[v]:
+                if j != i: adjacentEdges[i].append(j)
+
+    G["incidentEdges"] = incidentEdges
+    G["adjacentEdges"] = adjacentEdges
+
+
+# Input: a cubic graph G
+# Output: a list of all paths [u, v, w] of three vertices in G whose five neighbours outside the path are distinct, so no edge of the
+#         path is in a 3 cycle and the path is not in a 4 cycle, which are the paths that can be removed by createBlock.
+#         both [u, v, w] and [w, v, u] are in the list since they give different blocks
+def admissiblePaths(G):
+    neighbours = []
+    for v in G["vertices"]:
+        neighbours.append(set())
+    for e in G["edges"]:
+        u, w = e
+        neighbours[u].add(w)
+        neighbours[w].add(u)
+
+    paths = []
+    for v in G["vertices"]:
+        for u in sorted(neighbours[v]):
+            for w in sorted(neighbours[v]):
+                if u == w:
+                    continue
+                outside = (neighbours[u] | neighbours[v] | neighbours[w]) - {u, v, w}
+                if len(outside) == 5:
+                    paths.append([u, v, w])
+
+    return paths
+
+# Input: a cubic graph G
+# Output: the blocks made from G by removing any admissible path, crossed or not, grouped by isomorphism.
+#         this is a list with for each isomorphism class a dictionary with "block", the first block of the class,
+#         and "blocks", the list of pairs [path, crossed] giving the blocks of the class
+def createBlockClasses(G):
+    classes = {}
+    for path in admissiblePaths(G):
+        for crossed in [False, True]:
+            B = createBlock(G, path, crossed)
+            form = blockCanonicalForm(B)
+            if form not in classes:
+                classes[form] = {"block": B, "blocks": []}
+            classes[form]["blocks"].append([path, crossed])
+
+    return list(classes.values())
+
+# Input: a block B
+# Output: a canonical form of B, which is the same for two blocks if and only if there is an isomorphism between them which maps
+#         the spoke to the spoke, and the left and right semiedges to the left and right semiedges in the same order. we also allow
+#         swapping both the two left and the two right semiedges, since that just swaps which strand of the blocks is the first one
+def blockCanonicalForm(B):
+    neighbours = []
+    for v in B["vertices"]:
+        neighbours.append([])
+    for e in B["edges"]:
+        u, w = e
+        neighbours[u].append(w)
+        neighbours[w].append(u)
+
+    ends = []
+    for e in B["boundaryEdges"]:
+        for v in B["edges"][e]:
+            if len(B["incidentEdges"][v]) == 1: ends.append(v)
+
+    forms = []
+    for roles in [ends, [ends[0], ends[2], ends[1], ends[4], ends[3]]]:
+        colours = [0] * len(neighbours)
+        for i in range(len(roles)):
+            colours[roles[i]] = i + 1
+        forms.append(canonicalForm(neighbours, colours))
+
+    return min(forms)
+
+# Input: the list of neighbours of each vertex of a graph and a colour for each vertex
+# Output: the smallest sorted list of edges we get by numbering the vertices in an order which respects the colours,
+#         found by refining the colours and trying each vertex of the first class which has more than one vertex
+def canonicalForm(neighbours, colours):
+    colours = refineColours(neighbours, colours)
+
+    cell = -1
+    for c in range(len(colours)):
+        if colours.count(c) > 1:
+            cell = c
+            break
+
+    if cell == -1:
+        edges = []
+        for v in range(len(neighbours)):
+            for w in neighbours[v]:
+                if colours[v] < colours[w]: edges.append((colours[v], colours[w]))
+        return tuple(sorted(edges))
+
+    best = None
+    for v in range(len(colours)):
+        if colours[v] == cell:
+            newColours = []
+            for w in range(len(colours)):
+                newColours.append(2*colours[w] + 1)
+            newColours[v] = 2*cell
+            form = canonicalForm(neighbours, newColours)
+            if best is None or form < best:
+                best = form
+
+    return best
+
+# Input: the list of neighbours of each vertex of a graph and a colour for each vertex
+# Output: the colours refined until two vertices of the same colour have the same amount of neighbours of each colour.
+#         the new colours are numbered 0, 1, ... in an order which does not depend on the numbering of the vertices
+def refineColours(neighbours, colours):
+    classAmount = -1
+    while True:
+        signatures = []
+        for v in range(len(neighbours)):
+            signatures.append((colours[v], tuple(sorted(colours[w] for w in neighbours[v]))))
+        ranks = {}
+        for s in sorted(set(signatures)):
+            ranks[s] = len(ranks)
+        colours = [ranks[s] for s in signatures]
+
+        if len(ranks) == classAmount:
+            return colours
+        classAmount = len(ranks)
 
 # Input:
 # colourAmount: amount of colours
 # colours: a partial normal colouring of a graph
 # edgeAdjacency: a list containing the amount of adjacent coloured edges for each edge
+# metrics: optionally the metrics made by createMetrics, in which the amount of nodes of the search is recorded
+# forwardChecking: whether to search with extendEdgeColouringForward instead of extendEdgeColouring
 # Output: a list with all normal colourings with the specified amount of colours containing the initial colouring
-def createEdgeColourings(colourAmount, colours, edgeAdjacency):
-    colourings = []
-    edgeToColour = {}
-    maxAdjacency = -1
+#         both searches give the colourings in the same order
+def createEdgeColourings(colourAmount, colours, edgeAdjacency, metrics = None, forwardChecking = False):
+    started = startStage(metrics, "createEdgeColourings")
+    edges = [tuple(c[0]) for c in colours]
+    edgeColours = [c[1] for c in colours]
+    adjacencyCount = [e[1] for e in edgeAdjacency]
+
+    incidentEdges = [[] for _ in range(max(max(e) for e in edges) + 1)] if edges else []
+    for i in range(len(edges)):
+        for v in edges[i]:
+            incidentEdges[v].append(i)
+
+    # usedColours[v] is a bitmask of the colours of the coloured edges incident with v
+    usedColours = [0] * len(incidentEdges)
+    for i in range(len(edges)):
+        if edgeColours[i] != -1:
+            for v in edges[i]:
+                usedColours[v] |= 1 << edgeColours[i]
+
+    bitCount = [bin(m).count("1") for m in range(1 << colourAmount)]
+    search = {"colourAmount": colourAmount, "edges": edges, "edgeSets": [c[0] for c in colours],
+              "incidentEdges": incidentEdges, "edgeColours": edgeColours, "usedColours": usedColours,
+              "adjacencyCount": adjacencyCount, "bitCount": bitCount, "nodesVisited": 0, "nodesPruned": 0}
 
-    for e in edgeAdjacency:
-        if e[1] > maxAdjacency:
-            maxAdjacency = e[1]
-            edgeToColour = e[0]
-
-    if edgeToColour == {}:
-        return [colours]
-
-    newEdgeAdjacency = copyColouring(edgeAdjacency)
-    for e in newEdgeAdjacency:
-        if e[0] == edgeToColour: e[1] = -1
-        else:
-            for v in edgeToColour:
-                if v in e[0]:
-                    if e[1] != -1: e[1] += 1
-
-    for i in range(colourAmount):
-        newColours = copyColouring(colours)
-        for e in newColours:
-            if e[0] == edgeToColour:
-                e[1] = i
-
-        if isNormalColouredEdge(newColours, edgeToColour):
-            colourings.extend(createEdgeColourings(colourAmount, newColours, newEdgeAdjacency))
+    colourings = []
+    if forwardChecking:
+        search["allColours"] = (1 << colourAmount) - 1
+        search["adjacentEdges"] = [[f for v in edges[i] for f in incidentEdges[v] if f != i] for i in range(len(edges))]
+        search["uncolouredAmount"] = edgeColours.count(-1)
+        search["feasibleColours"] = [feasibleColours(search, i) if edgeColours[i] == -1 else 0 for i in range(len(edges))]
+        if 0 not in [search["feasibleColours"][i] for i in range(len(edges)) if edgeColours[i] == -1]:
+            extendEdgeColouringForward(search, colourings)
+
+#       the colourings are put in the order in which extendEdgeColouring finds them
+        edgeOrder = searchEdgeOrder(edgeAdjacency)
+        colourings.sort(key=lambda colouring: [colouring[i][1] for i in edgeOrder])
+    else:
+        extendEdgeColouring(search, colourings)
 
+    finishStage(metrics, started, {"nodesVisited": search["nodesVisited"], "nodesPruned": search["nodesPruned"], "colourings": len(colourings)})
     return colourings
 
-# Input: a colouring
-# Output: a copy of the colouring
-def copyColouring(colouring):
-    colouringCopy = []
-    for e in colouring:
-        colouringCopy.append([e[0].copy(),e[1]])
-
-    return colouringCopy
-
-# Input: a colouring and an edge of the coloured graph
-# Output: whether the colouring is a proper colouring at the ends of the edge and normal at the edge
-def isNormalColouredEdge(colours, edge):
-    for v in edge:
-        if not isColouredVertex(colours, v):
-            return False
-
-        for e in colours:
-            if v in e[0] and e[0] != edge:
-                if not isNormalEdge(colours, e[0]):
+# Input: the state of a search started by createEdgeColourings and a list to which colourings are added
+# Output: none, all normal colourings extending the current partial colouring are added to the list
+#         the edge with the most coloured adjacent edges is coloured next, every assignment is undone before returning
+#         so the state is the same as before the call. every call counts as a visited node, and every colour that is not tried
+#         further because it is already used at an end of the edge or makes an edge abnormal counts as a pruned node
+def extendEdgeColouring(search, colourings):
+    search["nodesVisited"] += 1
+    edges = search["edges"]
+    incidentEdges = search["incidentEdges"]
+    edgeColours = search["edgeColours"]
+    usedColours = search["usedColours"]
+    adjacencyCount = search["adjacencyCount"]
+
+    edgeToColour = max(range(len(edges)), key=adjacencyCount.__getitem__, default=-1)
+    if edgeToColour == -1 or adjacencyCount[edgeToColour] == -1:
+        edgeSets = search["edgeSets"]
+        colourings.append([[edgeSets[i], edgeColours[i]] for i in range(len(edges))])
+        return
+
+    previousCount = adjacencyCount[edgeToColour]
+    adjacencyCount[edgeToColour] = -1
+    for v in edges[edgeToColour]:
+        for f in incidentEdges[v]:
+            if adjacencyCount[f] != -1: adjacencyCount[f] += 1
+
+    u, w = edges[edgeToColour]
+    for i in range(search["colourAmount"]):
+        colourBit = 1 << i
+        if (usedColours[u] | usedColours[w]) & colourBit:
+            search["nodesPruned"] += 1
+            continue
+
+        edgeColours[edgeToColour] = i
+        usedColours[u] |= colourBit
+        usedColours[w] |= colourBit
+
+        if isNormalColouredEdge(search, edgeToColour):
+            extendEdgeColouring(search, colourings)
+        else:
+            search["nodesPruned"] += 1
+
+        usedColours[u] ^= colourBit
+        usedColours[w] ^= colourBit
+    edgeColours[edgeToColour] = -1
+
+    for v in edges[edgeToColour]:
+        for f in incidentEdges[v]:
+            if adjacencyCount[f] != -1: adjacencyCount[f] -= 1
+    adjacencyCount[edgeToColour] = previousCount
+
+# Input: the state of a search started by createEdgeColourings with forward checking and a list to which colourings are added
+# Output: none, all normal colourings extending the current partial colouring are added to the list
+#         for each uncoloured edge the search keeps the colours it can still get as made by feasibleColours, and colours the edge with
+#         the fewest of them next, the one with the most coloured adjacent edges among those. after colouring an edge the feasible colours
+#         of the edges near it are updated, and the colour is not tried further if an edge is left without feasible colours.
+#         every call counts as a visited node, and every colour that is not tried further counts as a pruned node
+def extendEdgeColouringForward(search, colourings):
+    search["nodesVisited"] += 1
+    edges = search["edges"]
+    edgeColours = search["edgeColours"]
+    usedColours = search["usedColours"]
+    adjacencyCount = search["adjacencyCount"]
+    feasible = search["feasibleColours"]
+    bitCount = search["bitCount"]
+
+    if search["uncolouredAmount"] == 0:
+        edgeSets = search["edgeSets"]
+        colourings.append([[edgeSets[i], edgeColours[i]] for i in range(len(edges))])
+        return
+
+    edgeToColour = -1
+    for i in range(len(edges)):
+        if edgeColours[i] == -1:
+            if edgeToColour == -1 or bitCount[feasible[i]] < bitCount[feasible[edgeToColour]] or \
+                    (bitCount[feasible[i]] == bitCount[feasible[edgeToColour]] and adjacencyCount[i] > adjacencyCount[edgeToColour]):
+                edgeToColour = i
+
+    u, w = edges[edgeToColour]
+    nearEdges = nearUncolouredEdges(search, edgeToColour)
+    previousFeasible = [feasible[f] for f in nearEdges]
+    for f in search["adjacentEdges"][edgeToColour]:
+        if edgeColours[f] == -1: adjacencyCount[f] += 1
+    search["uncolouredAmount"] -= 1
+
+    for i in range(search["colourAmount"]):
+        colourBit = 1 << i
+        if not feasible[edgeToColour] & colourBit:
+            continue
+
+        edgeColours[edgeToColour] = i
+        usedColours[u] |= colourBit
+        usedColours[w] |= colourBit
+
+        wipedOut = False
+        for f in nearEdges:
+            feasible[f] = feasibleColours(search, f)
+            if feasible[f] == 0:
+                wipedOut = True
+        if wipedOut:
+            search["nodesPruned"] += 1
+        else:
+            extendEdgeColouringForward(search, colourings)
+
+        usedColours[u] ^= colourBit
+        usedColours[w] ^= colourBit
+    edgeColours[edgeToColour] = -1
+
+    for j in range(len(nearEdges)):
+        feasible[nearEdges[j]] = previousFeasible[j]
+    for f in search["adjacentEdges"][edgeToColour]:
+        if edgeColours[f] == -1: adjacencyCount[f] -= 1
+    search["uncolouredAmount"] += 1
+
+# Input: the state of a search started by createEdgeColourings and the index of an uncoloured edge
+# Output: the colours the edge can get, as a mask made by colourMask: those not used at its ends, such that the edge is normal if all edges
+#         at its ends are then coloured, and such that a coloured edge whose edges at both ends are all coloured once this edge is, is normal
+#         an edge is normal if its ends have 3 or 5 colours together, as checked by isNormalColouredEdge
+def feasibleColours(search, edge):
+    edges = search["edges"]
+    usedColours = search["usedColours"]
+    bitCount = search["bitCount"]
+
+    a, b = edges[edge]
+    colours = search["allColours"] & ~(usedColours[a] | usedColours[b])
+    if bitCount[usedColours[a]] == 2 and bitCount[usedColours[b]] == 2 and bitCount[usedColours[a] | usedColours[b]] == 3:
+        return 0
+
+    for v in edges[edge]:
+        if bitCount[usedColours[v]] == 2:
+            for f in search["incidentEdges"][v]:
+                if f != edge:
+                    x = edges[f][0] if edges[f][1] == v else edges[f][1]
+                    if bitCount[usedColours[x]] == 3:
+                        for i in range(search["colourAmount"]):
+                            if colours & (1 << i) and bitCount[usedColours[v] | (1 << i) | usedColours[x]] == 4:
+                                colours ^= 1 << i
+
+    return colours
+
+# Input: the state of a search started by createEdgeColourings and the index of an edge
+# Output: the uncoloured edges whose feasible colours can change when this edge is coloured, which are those with an end at distance
+#         at most one from an end of the edge, without the edge itself
+def nearUncolouredEdges(search, edge):
+    edges = search["edges"]
+    incidentEdges = search["incidentEdges"]
+    edgeColours = search["edgeColours"]
+
+    near = set()
+    for v in edges[edge]:
+        for f in incidentEdges[v]:
+            for x in edges[f]:
+                for g in incidentEdges[x]:
+                    if g != edge and edgeColours[g] == -1:
+                        near.add(g)
+
+    return sorted(near)
+
+# Input: a list containing the amount of adjacent coloured edges for each edge, as given to createEdgeColourings
+# Output: the order in which extendEdgeColouring colours the uncoloured edges, which does not depend on the colours it chooses
+def searchEdgeOrder(edgeAdjacency):
+    adjacencyCount = [e[1] for e in edgeAdjacency]
+    edges = [tuple(e[0]) for e in edgeAdjacency]
+    incidentEdges = {}
+    for i in range(len(edges)):
+        for v in edges[i]:
+            incidentEdges.setdefault(v, []).append(i)
+
+    edgeOrder = []
+    while adjacencyCount and max(adjacencyCount) != -1:
+        edgeToColour = adjacencyCount.index(max(adjacencyCount))
+        edgeOrder.append(edgeToColour)
+        adjacencyCount[edgeToColour] = -1
+        for v in edges[edgeToColour]:
+            for f in incidentEdges[v]:
+                if adjacencyCount[f] != -1: adjacencyCount[f] += 1
+
+    return edgeOrder
+
+# Input: the state of a search started by createEdgeColourings and the index of an edge that was just coloured
+# Output: whether every edge incident with an end of this edge, including the edge itself, is normal
+#         an edge is only checked once all six colours around it are known, which is when both its ends have three colours
+def isNormalColouredEdge(search, edge):
+    edges = search["edges"]
+    usedColours = search["usedColours"]
+    bitCount = search["bitCount"]
+
+    for v in edges[edge]:
+        for f in search["incidentEdges"][v]:
+            a, b = edges[f]
+            if bitCount[usedColours[a]] + bitCount[usedColours[b]] == 6:
+                if bitCount[usedColours[a] | usedColours[b]] == 4:
                     return False
 
-    if not isNormalEdge(colours, edge):
-        return False
-
-    return True
-
-# Input: a colouring and a vertex of the coloured graph
-# Output: whether the edges incident with the vertex have different colours
-def isColouredVertex(colours, vertex):
-    incidentColours = []
-    for e in colours:
-        if e[1] != -1 and vertex in e[0]: incidentColours.append(e[1])
-
-    if len(incidentColours) != len(set(incidentColours)):
-        return False
-
     return True
 
-# Input: a colouring and an edge of the coloured graph
-# Output: whether the edge is normal in the colouring
-def isNormalEdge(colours, edge):
-    incidentColours = []
-    for v in edge:
-        for e in colours:
-            if e[1] != -1 and v in e[0]:
-                incidentColours.append(e[1])
-
-    if len(incidentColours) == 6:
-        if len(set(incidentColours)) == 3 or len(set(incidentColours)) == 5:
-            return True
-        else:
-            return False
-    else:
-        return True
+# Input: a block B, optionally the metrics made by createMetrics, whether to search with forward checking as in createEdgeColourings,
+#        and optionally the colourings made by createB12Colourings for B, which are then not searched again
+# Output: the normal 5-edge-colourings of B that obey condition (1) and (2) in the thesis, where colourings with a configuration
+#         of an earlier colouring are left out, their configurations, and the amount of colourings before leaving any out.
+#         the colourings with spoke coloured 0 come first, then those with spoke coloured 1 and then 2
+def createBColourings(B, metrics = None, forwardChecking = True, B12Colourings = None):
+    started = startStage(metrics, "createBColourings")
+    if B12Colourings is None:
+        B12Colourings = createB12Colourings(B, metrics, forwardChecking)
+    BColourings, BConfigurations, amount = createCulledColourings(iterateBColourings(B12Colourings), B)
+
+    finishStage(metrics, started, {"colourings": amount, "culledColourings": len(BColourings)})
+    return BColourings, BConfigurations, amount
+
+# Input: a block B, optionally the metrics made by createMetrics, and whether to search with forward checking as in createEdgeColourings
+# Output: all normal 5-edge-colourings of B where the spoke has colour 0 and the other two edges at its end in B have colours 1 and 2
+def createB12Colourings(B, metrics = None, forwardChecking = True):
+    colouringPreset, edgeAdjacencyPreset = createB12Preset(B)
+    return createEdgeColourings(5, colouringPreset, edgeAdjacencyPreset, metrics, forwardChecking)
 
 # Input: a block B
-# Output: all normal 5-edge-colourings of B that obey condition (1) and (2) in the thesis
-def createBColourings(B):
+# Output: the partial colouring of B with the spoke coloured 0 and the other two edges at its end in B coloured 1 and 2, and for each
+#         edge the amount of its adjacent edges coloured in it, or -1 for a coloured edge, as given to createEdgeColourings
+def createB12Preset(B):
     colouringPreset = []
     for e in B["edges"]:
         colouringPreset.append([e, -1])
 
-    edgeAdjacencyPreset = copyColouring(colouringPreset)
-
     colouringPreset[0][1] = 0
     colouringPreset[1][1] = 1
     colouringPreset[2][1] = 2
 
-    for e in edgeAdjacencyPreset:
-        e[1] = 0
-        for f in colouringPreset:
-            if f[0] == e[0] and f[1] != -1:
-                e[1] = -1
-                break
-            else:
-                for v in e[0]:
-                    if v in f[0] and f[1] != -1:
-                        e[1] += 1
-
-    B12Colourings = createEdgeColourings(5, colouringPreset, edgeAdjacencyPreset)
+    edgeAdjacencyPreset = []
+    for i in range(len(B["edges"])):
+        if colouringPreset[i][1] != -1:
+            edgeAdjacencyPreset.append([B["edges"][i], -1])
+        else:
+            colouredAmount = 0
+            for j in B["adjacentEdges"][i]:
+                if colouringPreset[j][1] != -1: colouredAmount += 1
+            edgeAdjacencyPreset.append([B["edges"][i], colouredAmount])
+
+    return colouringPreset, edgeAdjacencyPreset
+
+# Input: the colourings made by createB12Colourings for a block, a block B which only differs from it in which right semiedge is which,
+#        like the crossed and uncrossed block made from the same graph and path, and optionally the metrics made by createMetrics
+# Output: the colourings createB12Colourings makes for B, which are the given colourings with the colours of the right semiedges swapped.
+#         createB12Colourings gives them in the order in which extendEdgeColouring finds them, which is by their colours in the order
+#         of searchEdgeOrder, so the swapped colourings are put in this order for B
+def createPairedB12Colourings(B12Colourings, B, metrics = None):
+    started = startStage(metrics, "createPairedB12Colourings")
+    edges = B["edges"]
+    right0, right1 = B["rightSemiedges"]
+    positions = list(range(len(edges)))
+    positions[right0], positions[right1] = right1, right0
 
-    allB0Colourings = []
-    for c in B12Colourings:
-        allB0Colourings.append(c)
-        allB0Colourings.append(permute2Colours(c, 1, 2))
-        allB0Colourings.append(permute2Colours(permute2Colours(c, 1, 3), 2, 4))
-        allB0Colourings.append(permute2Colours(permute2Colours(c, 1, 4), 2, 3))
+    colourings = []
+    for colouring in B12Colourings:
+        colourings.append([[edges[i], colouring[positions[i]][1]] for i in range(len(edges))])
+    edgeOrder = searchEdgeOrder(createB12Preset(B)[1])
+    colourings.sort(key=lambda colouring: [colouring[i][1] for i in edgeOrder])
 
-    allB1Colourings = []
-    allB2Colourings = []
-    for c in allB0Colourings:
-        allB1Colourings.append(permute2Colours(c, 0, 1))
-        allB2Colourings.append(permute2Colours(c, 0, 2))
+    finishStage(metrics, started, {"colourings": len(colourings)})
+    return colourings
 
-    return allB0Colourings, allB1Colourings, allB2Colourings
+# Input: the colourings of a block with the first three edges coloured 0, 1 and 2, as made in createBColourings
+# Output: a generator of all colourings of the block we get by permuting the colours such that the spoke keeps colour 0 and the other
+#         edges at the spoke vertex get two colours from {1, 2} or {3, 4}, followed by the same colourings with colours 0 and 1 swapped,
+#         and then with colours 0 and 2 swapped. the colourings share their lists with the given colourings
+def iterateBColourings(B12Colourings):
+    for spokeColour in [0, 1, 2]:
+        for c in B12Colourings:
+            c = [c, identityPermutation]
+            for d in [c, permute2Colours(c, 1, 2), permute2Colours(permute2Colours(c, 1, 3), 2, 4), permute2Colours(permute2Colours(c, 1, 4), 2, 3)]:
+                if spokeColour == 0:
+                    yield d
+                else:
+                    yield permute2Colours(d, 0, spokeColour)
+
+# Input: a block B, optionally the metrics made by createMetrics, whether to search with forward checking as in createEdgeColourings,
+#        and optionally the colourings made by createB12Colourings for B, which are then not searched again
+# Output: all normal 5-edge-colourings of B, without the conditions of the thesis, where colourings with a configuration of an earlier
+#         colouring are left out, their configurations, and the amount of colourings before leaving any out. the colourings with
+#         spoke coloured 0 come first, then those with spoke coloured 1, and so on
+def createAllBColourings(B, metrics = None, forwardChecking = True, B12Colourings = None):
+    started = startStage(metrics, "createAllBColourings")
+    if B12Colourings is None:
+        B12Colourings = createB12Colourings(B, metrics, forwardChecking)
+    BColourings, BConfigurations, amount = createCulledColourings(iterateAllBColourings(B12Colourings), B)
+
+    finishStage(metrics, started, {"colourings": amount, "culledColourings": len(BColourings)})
+    return BColourings, BConfigurations, amount
+
+# Input: the colourings of a block with the first three edges coloured 0, 1 and 2, as made in createBColourings
+# Output: a generator of all colourings of the block we get by permuting the colours, those with spoke coloured 0 first.
+#         the other two edges at the spoke can get any two colours, so every normal colouring of the block is made
+def iterateAllBColourings(B12Colourings):
+    for spokeColour in range(5):
+        for c in B12Colourings:
+            for colours in itertools.permutations([1, 2, 3, 4]):
+                d = [c, (0,) + colours]
+                if spokeColour == 0:
+                    yield d
+                else:
+                    yield permute2Colours(d, 0, spokeColour)
 
 # Input: a colouring and two colour of the colouring
-# Output: a copy of the colouring where the two colours are swapped
+# Output: the colouring where the two colours are swapped, which shares its list of edges and colours with the given colouring
 def permute2Colours(colouring, c1, c2):
-    newColouring = copyColouring(colouring)
-
-    for e in newColouring:
-        if e[1] == c1:
-            e[1] = c2
-        elif e[1] == c2:
-            e[1] = c1
-
-    return newColouring
-
-# Input: a list of colourings of the same graph and a list of edges of that graph
-# Output: a list containing the configurations of each of the colourings. A configuration is a list which contains a list with two elements for each edge.
-#         the first element is the colour of the edge, the second is a list of all colours of edges adjacent to the edge
-def createConfigurations(colourings, edges):
-    configurations = []
-    for colouring in colourings:
-        configuration = []
-        for e in edges:
-            edgeColour = -1
-            for c in colouring:
-                if e == c[0]: edgeColour = c[1]
-
-            incidentColours = []
-            for v in e:
-                for c in colouring:
-                    if v in c[0] and c[1] != edgeColour: incidentColours.append(c[1])
+    permutation = list(colouring[1])
+    for i in range(len(permutation)):
+        if permutation[i] == c1:
+            permutation[i] = c2
+        elif permutation[i] == c2:
+            permutation[i] = c1
 
-            configuration.append([edgeColour, incidentColours])
+    return [colouring[0], tuple(permutation)]
 
-        configurations.append(configuration)
+# Input: a colouring
+# Output: the list which contains for each edge a list [edge, colour] in this colouring
+def expandColouring(colouring):
+    permutation = colouring[1]
+    expandedColouring = []
+    for e in colouring[0]:
+        expandedColouring.append([e[0], permutation[e[1]]])
 
-    return configurations
+    return expandedColouring
 
-# Input: a list of configurations of colourings of a graph
+# Input: a colouring of a graph G, which is a block or a combination of blocks, and G
+# Output: the configuration of the colouring. A configuration is a list which contains a list with two elements for each boundary edge of G.
+#         the first element is the colour of the edge, the second is a list of all colours of edges adjacent to the edge
+#         the configuration is read from the shared list of the colouring, with its permutation applied to the colours we read
+def createConfiguration(colouring, G):
+    colouring, permutation = colouring
+    configuration = []
+    for e in G["boundaryEdges"]:
+        incidentColours = []
+        for f in G["adjacentEdges"][e]:
+            incidentColours.append(permutation[colouring[f][1]])
+
+        configuration.append([permutation[colouring[e][1]], incidentColours])
+
+    return configuration
+
+# Input: a graph G, which is a block or a combination of blocks
+# Output: an array with for each boundary edge of G the edge followed by its adjacent edges, so the columns of a colouring which are read
+#         for its configuration, in the order of createConfiguration
+def configurationColumns(G):
+    columns = []
+    for e in G["boundaryEdges"]:
+        columns.append(e)
+        columns.extend(G["adjacentEdges"][e])
+
+    return numpy.array(columns, dtype=numpy.intp)
+
+# Input: a list of colourings of a block G, and G
+# Output: a matrix of type uint8 with a row for each colouring, which contains for each boundary edge the colour of the edge followed by the
+#         colours of its adjacent edges. the shared lists of the colourings are put in a matrix with a row for each shared list and a column
+#         for each edge, the columns of configurationColumns are taken from it, and the permutations are applied to all rows at once
+def createConfigurationMatrix(colourings, G):
+    columns = configurationColumns(G)
+    if len(colourings) == 0:
+        return numpy.zeros((0, len(columns)), dtype=numpy.uint8)
+
+    sharedRows = {}
+    sharedLists = []
+    listRows = []
+    permutations = []
+    for colouring, permutation in colourings:
+        if id(colouring) not in sharedRows:
+            sharedRows[id(colouring)] = len(sharedLists)
+            sharedLists.append([e[1] for e in colouring])
+        listRows.append(sharedRows[id(colouring)])
+        permutations.append(permutation)
+
+    colours = numpy.array(sharedLists, dtype=numpy.intp)[:, columns][listRows]
+    return numpy.take_along_axis(numpy.array(permutations, dtype=numpy.uint8), colours, axis=1)
+
+# Input: a row of the matrix made by createConfigurationMatrix as a list, and the graph G of the colourings
+# Output: the configuration in this row, as made by createConfiguration
+def configurationFromRow(row, G):
+    configuration = []
+    i = 0
+    for e in G["boundaryEdges"]:
+        adjacentAmount = len(G["adjacentEdges"][e])
+        configuration.append([row[i], row[i+1:i+1+adjacentAmount]])
+        i += 1 + adjacentAmount
+
+    return configuration
+
+# Input: a list of configurations of colourings of graphs, which can be combinations of different amounts of blocks
+# Output: a matrix of type uint8 with a row for each configuration, which contains for the left and right semiedges two columns each:
+#         the colour of the semiedge and the mask made by colourMask of the colours adjacent to it
+def createCompactConfigurations(configurations):
+    rows = []
+    for configuration in configurations:
+        row = []
+        for e in configuration[-4:]:
+            row.append(e[0])
+            row.append(colourMask(e[1]))
+        rows.append(row)
+
+    return numpy.array(rows, dtype=numpy.uint8).reshape(len(rows), 8)
+
+# Input: a list of configurations of colourings of a graph, optionally the metrics made by createMetrics, the amount of processes to use,
+#        and optionally a file to store the graph in
 # Output: a directed graph whose vertices are the colourings corresponding to the configurations,
 #         where a colouring has an edge to another colouring if their combined colouring is normal
-#         the list of edges of this graph will be ordered
-def createColouringsGraph(configurations, progressMeter = False):
+#         if a file is given the rows are written to it as they are made, and the graph is mapped from this file
+def createColouringsGraph(configurations, metrics = None, workers = 1, fileName = None):
+    started = startStage(metrics, "createColouringsGraph")
     lenConfigurations = len(configurations)
+    arcsTested = 0
     vertices = list(range(lenConfigurations))
-    edges = []
-
-    for v in vertices:
-        if progressMeter and (v + 1) % round(lenConfigurations / 100) == 0:
-            print("\r" + str(round((v + 1) / lenConfigurations * 100)) + "%", end="", flush=True)
-        for w in vertices:
-            config1 = configurations[v]
-            config2 = configurations[w]
-
-            if config1[-2][0] == config2[-4][0] and config1[-1][0] == config2[-3][0]:
-                if not len(set(config1[-2][1]).intersection(config2[-4][1])) == 1:
-                    if not len(set(config1[-1][1]).intersection(config2[-3][1])) == 1:
-                        edges.append([v,w])
-
-    G = {"vertices": vertices, "edges": edges}
-    return G
-
-# Input: the directed graph of all colourings of B with spoke coloured 0, and a list of all these colourings
-# Output: a list containing all colourings of B^2 that obey condition (2) in the thesis
-def createB2Colourings(B0ColouringsGraph, B0Colourings):
-    B20Colourings = []
-    for e in B0ColouringsGraph["edges"]:
-        B20Colourings.append(combine2BColourings(B0Colourings[e[0]], B0Colourings[e[1]]))
-
-    B2Colourings = []
-    for c in B20Colourings:
-        B2Colourings.append(c)
-        B2Colourings.append(permute2Colours(c, 0, 1))
-        B2Colourings.append(permute2Colours(c, 0, 2))
-
-    return B2Colourings
-
-# Input: two colourings of B
-# Output: their combined colouring on B^2
-def combine2BColourings(c1, c2):
-    leftColouring = []
-    rightColouring = []
-
-    i = 0
-    while i < BInternalEdges:
-        e = c1[i+1][0]
-        leftColouring.append(c1[i+1])
-        rightColouring.append([{min(e) + BInternalVertices, max(e) + BInternalVertices}, c2[i+1][1]])
-        i += 1
+    offsets = array("q", [0])
+    targets = array("i")
+    if fileName is not None:
+        graphFile = startGraphFile(fileName)
+
+    if workers > 1:
+        ranges = rowRanges(lenConfigurations, workers)
+        with ProcessPoolExecutor(workers, initializer=initialiseWorker, initargs=({"configurations": configurations},)) as executor:
+            for r, rows in zip(ranges, executor.map(colouringsGraphWorker, ranges)):
+                rowLengths, rowTargets, tested = rows
+                arcsTested += tested
+                for l in rowLengths:
+                    offsets.append(offsets[-1] + l)
+                if fileName is not None:
+                    graphFile.write(rowTargets.tobytes())
+                else:
+                    targets.extend(rowTargets)
+                reportProgress(metrics, "colourings graph", r[1], lenConfigurations)
+    else:
+        graphIndex = createColouringsGraphIndex(configurations)
+        for r in rowRanges(lenConfigurations, 1):
+            rowLengths, rowTargets, tested = colouringsGraphRows(graphIndex, r[0], r[1], metrics)
+            arcsTested += tested
+            for l in rowLengths:
+                offsets.append(offsets[-1] + l)
+            if fileName is not None:
+                graphFile.write(rowTargets.tobytes())
+            else:
+                targets.extend(rowTargets)
+            reportProgress(metrics, "colourings graph", r[1], lenConfigurations)
 
-    combinedColouring = leftColouring + rightColouring
+    finishStage(metrics, started, {"colourings": lenConfigurations, "arcsTested": arcsTested, "arcsAccepted": offsets[-1]})
+    if fileName is not None:
+        finishGraphFile(graphFile, offsets)
+        G = openGraphFile(fileName)
+        G["vertices"] = vertices
+        return G
 
-    #colouring the connecting edges
-    combinedColouring.append([{min(c1[-2][0]), min(c2[-4][0]) + BInternalVertices}, c1[-2][1]])
-    combinedColouring.append([{min(c1[-1][0]), min(c2[-3][0]) + BInternalVertices}, c1[-1][1]])
+    G = {"vertices": vertices, "offsets": offsets, "targets": targets}
+    return G
 
-    #colouring the horizontal semiedges
-    combinedColouring.append([{min(c1[-4][0]), 2*BInternalVertices}, c1[-4][1]])
-    combinedColouring.append([{min(c1[-3][0]), 2*BInternalVertices + 1}, c1[-3][1]])
-    combinedColouring.append([{min(c2[-2][0]) + BInternalVertices, 2*BInternalVertices + 2}, c2[-2][1]])
-    combinedColouring.append([{min(c2[-1][0]) + BInternalVertices, 2*BInternalVertices + 3}, c2[-1][1]])
+# Input: a list of configurations of colourings of a graph
+# Output: a dictionary with what is needed to make rows of the graph of colourings: the configurations with the buckets and masks made by
+#         createLeftBuckets, or if numpy is available the matrix made by createCompactConfigurations with the buckets made by createLeftBucketArrays
+def createColouringsGraphIndex(configurations):
+    if numpy is None:
+        leftBuckets, leftMasks = createLeftBuckets(configurations)
+        return {"configurations": configurations, "leftBuckets": leftBuckets, "leftMasks": leftMasks}
+
+    compactConfigurations = createCompactConfigurations(configurations)
+    leftOrder, leftStarts = createLeftBucketArrays(compactConfigurations)
+    return {"compactConfigurations": compactConfigurations, "leftOrder": leftOrder, "leftStarts": leftStarts}
+
+# Input: a dictionary made by createColouringsGraphIndex, a range of vertices [start, end) and optionally the metrics made by createMetrics
+# Output: the rows of the graph of colourings in this range, as made by createColouringsGraphRows
+def colouringsGraphRows(graphIndex, start, end, metrics = None):
+    if "compactConfigurations" in graphIndex:
+        return createColouringsGraphRowsMatrix(graphIndex["compactConfigurations"], graphIndex["leftOrder"], graphIndex["leftStarts"], start, end,
+                                               metrics)
+
+    return createColouringsGraphRows(graphIndex["configurations"], graphIndex["leftBuckets"], graphIndex["leftMasks"], start, end, metrics)
 
-    #colouring the vertical semiedges
-    combinedColouring.insert(0, [{min(c2[0][0]) + BInternalVertices, 2 * BInternalVertices + 5}, c2[0][1]])
-    combinedColouring.insert(0, [{min(c1[0][0]), 2*BInternalVertices + 4}, c1[0][1]])
+# Input: a list of configurations of colourings of a graph
+# Output: a dictionary which maps the colours of the left semiedges to the ordered list of colourings with these colours, and for each
+#         colouring the pair of masks made by colourMask of the colours adjacent to its left semiedges
+#         a colouring can only have an edge to a colouring whose left semiedges have the colours of its right semiedges,
+#         so createColouringsGraphRows only has to look in the matching bucket
+def createLeftBuckets(configurations):
+    leftBuckets = {}
+    leftMasks = []
+    for w in range(len(configurations)):
+        config = configurations[w]
+        leftBuckets.setdefault((config[-4][0], config[-3][0]), []).append(w)
+        leftMasks.append((colourMask(config[-4][1]), colourMask(config[-3][1])))
+
+    return leftBuckets, leftMasks
+
+# Input: a list of configurations of colourings of a graph, the buckets and masks made by createLeftBuckets,
+#        a range of vertices [start, end) and optionally the metrics made by createMetrics to report the progress to
+# Output: for each vertex in this range the amount of vertices it has an edge to in the graph made by createColouringsGraph,
+#         an array with these vertices for each vertex in the range one after the other, and the amount of pairs of colourings tested
+def createColouringsGraphRows(configurations, leftBuckets, leftMasks, start, end, metrics = None):
+    lenConfigurations = len(configurations)
+    progressStep = max(1, lenConfigurations // 100)
+    rowLengths = array("i")
+    targets = array("i")
+    tested = 0
+
+    for v in range(start, end):
+        if (v + 1) % progressStep == 0 and v + 1 < end:
+            reportProgress(metrics, "colourings graph", v + 1, lenConfigurations)
+        config1 = configurations[v]
+        rightMask0 = colourMask(config1[-2][1])
+        rightMask1 = colourMask(config1[-1][1])
+
+        rowStart = len(targets)
+        bucket = leftBuckets.get((config1[-2][0], config1[-1][0]), [])
+        tested += len(bucket)
+        for w in bucket:
+            if colourBitCount[rightMask0 & leftMasks[w][0]] != 1:
+                if colourBitCount[rightMask1 & leftMasks[w][1]] != 1:
+                    targets.append(w)
+        rowLengths.append(len(targets) - rowStart)
+
+    return rowLengths, targets, tested
+
+# Input: a matrix made by createCompactConfigurations
+# Output: the rows of the matrix ordered by the colours of their left semiedges, and for each pair of colours (c, d) the position 5*c + d in
+#         this order where the rows with these colours start, followed by the amount of rows. the rows with the same colours stay in increasing
+#         order, so they are the bucket of createLeftBuckets
+def createLeftBucketArrays(compactConfigurations):
+    leftKeys = compactConfigurations[:, -8].astype(numpy.intp) * 5 + compactConfigurations[:, -6]
+    leftOrder = numpy.argsort(leftKeys, kind="stable").astype(numpy.intc)
+    leftStarts = numpy.searchsorted(leftKeys[leftOrder], numpy.arange(26))
+    return leftOrder, leftStarts
+
+# Input: a matrix made by createCompactConfigurations, the order and starts made by createLeftBucketArrays, a range of vertices [start, end)
+#        and optionally the metrics made by createMetrics to report the progress to
+# Output: the rows of the graph of colourings in this range, as made by createColouringsGraphRows
+#         the rows whose right semiedges have the same colours all test the same bucket, and rows which also have the same masks of colours
+#         adjacent to their right semiedges have the same targets. so the different pairs of masks of these rows are tested in blocks against
+#         the whole bucket at once, with a matrix of the masks of the right semiedges against the masks of the left semiedges.
+#         the progress is the amount of rows done, reported after each bucket
+def createColouringsGraphRowsMatrix(compactConfigurations, leftOrder, leftStarts, start, end, metrics = None):
+    bitCount = numpy.array(colourBitCount, dtype=numpy.uint8)
+    rows = numpy.arange(start, end)
+    rightKeys = compactConfigurations[start:end, -4].astype(numpy.intp) * 5 + compactConfigurations[start:end, -2]
+    rowTargets = {}
+    tested = 0
+    rowsDone = start
+
+    for key in numpy.unique(rightKeys).tolist():
+        group = rows[rightKeys == key]
+        bucket = leftOrder[leftStarts[key]:leftStarts[key+1]]
+        if len(bucket) != 0:
+            leftMasks0 = compactConfigurations[bucket, -7]
+            leftMasks1 = compactConfigurations[bucket, -5]
+            tested += len(group) * len(bucket)
+            rightMasks, groupMasks = numpy.unique(compactConfigurations[group][:, [-3, -1]], axis=0, return_inverse=True)
+            maskTargets = []
+            for blockStart in range(0, len(rightMasks), rowBlockSize):
+                block = rightMasks[blockStart:blockStart + rowBlockSize]
+                accepted = ((bitCount[block[:, 0, None] & leftMasks0[None, :]] != 1) & (bitCount[block[:, 1, None] & leftMasks1[None, :]] != 1))
+                for row in accepted:
+                    maskTargets.append(bucket[row])
+            for v, m in zip(group.tolist(), groupMasks.reshape(-1).tolist()):
+                rowTargets[v] = maskTargets[m]
+
+        rowsDone += len(group)
+        if rowsDone < end:
+            reportProgress(metrics, "colourings graph", rowsDone, len(compactConfigurations))
+
+#   the rows were made grouped by the colours of their right semiedges, so they are put back in increasing order
+    noTargets = numpy.zeros(0, dtype=numpy.intc)
+    rows = [rowTargets.get(v, noTargets) for v in range(start, end)]
+    rowLengths = array("i", numpy.array([len(row) for row in rows], dtype=numpy.intc).tobytes())
+    targets = array("i", numpy.concatenate(rows).tobytes()) if rows else array("i")
+    return rowLengths, targets, tested
+
+# Input: a list of colours
+# Output: an integer whose i-th bit is set if and only if colour i is in the list
+def colourMask(colours):
+    mask = 0
+    for c in colours:
+        mask |= 1 << c
+
+    return mask
+
+# Input: the graph B^2, the directed graph of all colourings of B with spoke coloured 0, the list of their configurations,
+#        and optionally the metrics made by createMetrics
+# Output: the colourings of B^2 that obey condition (2) in the thesis, where colourings with a configuration of an earlier colouring
+#         are left out, as made by createCulledCombinations, their configurations, and the amount of colourings before leaving any out
+def createB2Colourings(B2, B0ColouringsGraph, B0Configurations, metrics = None):
+    started = startStage(metrics, "createB2Colourings")
+    combinations = ((v, w) for v in B0ColouringsGraph["vertices"] for w in graphRow(B0ColouringsGraph, v))
+    B2Colourings, B2Configurations, amount = createCulledCombinations(B2, combinations, B0Configurations, B2Permutations)
+
+    finishStage(metrics, started, {"colourings": amount, "culledColourings": len(B2Colourings)})
+    return B2Colourings, B2Configurations, amount
+
+# Input: the graph B^k made by createCombinedBlock and a list of k colourings of B
+# Output: the list which contains for each edge of B^k a list [edge, colour] in the combined colouring
+def combineBColourings(Bk, colourings):
+    expandedColourings = [expandColouring(colouring) for colouring in colourings]
+    combinedColouring = []
+    for i in range(len(Bk["edges"])):
+        member, e = Bk["memberEdges"][i]
+        combinedColouring.append([Bk["edges"][i], expandedColourings[member][e][1]])
 
     return combinedColouring
 
-# Input: the directed graph of all colourings of B, and a list of all these colourings
-# Output: a list containing all colourings of B^3 that obey condition (1) in the thesis
-def createB3Colourings(BColouringsGraph, BColourings):
-    BColouringsAdjacency = createAdjacency(BColouringsGraph)
-
-    B3012Colourings = []
+# Input: the graph B^k made by createCombinedBlock and the configurations of a list of k attaching colourings of B
+# Output: the configuration of the combined colouring, which is read from the configurations of B without combining the colourings
+def combineBConfigurations(Bk, configurations):
+    configuration = []
+    for member, position, adjacentPositions in Bk["memberConfigurations"]:
+        colour, adjacentColours = configurations[member][position]
+        configuration.append([colour, [adjacentColours[p] for p in adjacentPositions]])
+
+    return configuration
+
+# Input: a configuration and a permutation of the colours
+# Output: the configuration of the colouring with its colours permuted
+def permuteConfiguration(configuration, permutation):
+    return [[permutation[colour], [permutation[c] for c in adjacentColours]] for colour, adjacentColours in configuration]
+
+# Input: the graph B^3, the directed graph of all colourings of B, the list of their configurations, and optionally the metrics made by createMetrics
+# Output: the colourings of B^3 that obey condition (1) in the thesis, where colourings with a configuration of an earlier colouring
+#         are left out, as made by createCulledCombinations, their configurations, and the amount of colourings before leaving any out
+def createB3Colourings(B3, BColouringsGraph, BConfigurations, metrics = None):
+    started = startStage(metrics, "createB3Colourings")
+    B3Colourings, B3Configurations, amount = createCulledCombinations(B3, iterateB3Combinations(BColouringsGraph, BConfigurations),
+                                                                      BConfigurations, B3Permutations)
+
+    finishStage(metrics, started, {"colourings": amount, "culledColourings": len(B3Colourings)})
+    return B3Colourings, B3Configurations, amount
+
+# Input: the directed graph of all colourings of B and the list of their configurations
+# Output: a generator of all triples of colourings of B with spokes coloured 0, 1 and 2, where each colouring attaches to the next
+def iterateB3Combinations(BColouringsGraph, BConfigurations):
     for v in BColouringsGraph["vertices"]:
-        if BColourings[v][0][1] == 0:
-            for w in BColouringsAdjacency[v]:
-                if BColourings[w][0][1] == 1:
-                    for u in BColouringsAdjacency[w]:
-                        if BColourings[u][0][1] == 2:
-                            B3012Colourings.append(combine3BColourings(BColourings[v], BColourings[w], BColourings[u]))
-
-    B3Colourings = []
-    for c in B3012Colourings:
-        B3Colourings.append(c)
-        B3Colourings.append(permute2Colours(c, 1, 2))
-        B3Colourings.append(permute2Colours(c, 0, 1))
-        B3Colourings.append(permute2Colours(permute2Colours(c, 1, 2), 0, 1))
-        B3Colourings.append(permute2Colours(permute2Colours(c, 1, 2), 0, 2))
-        B3Colourings.append(permute2Colours(c, 0, 2))
-
-    return B3Colourings
-
-# Input: a directed graph G whose list of edges is ordered
-# Output: a list which for each vertex of G contains the ordered list of vertices it is adjacent to.
-def createAdjacency(G):
-    adjacency = []
-    for v in G["vertices"]:
-        adjacency.append([])
-
-    for e in G["edges"]:
-        adjacency[e[0]].append(e[1])
+        if BConfigurations[v][0][0] == 0:
+            for w in graphRow(BColouringsGraph, v):
+                if BConfigurations[w][0][0] == 1:
+                    for u in graphRow(BColouringsGraph, w):
+                        if BConfigurations[u][0][0] == 2:
+                            yield (v, w, u)
+
+# Input: the graph B^k made by createCombinedBlock, an iterable of tuples of k attaching colourings of B given by their position,
+#        the list of configurations of the colourings of B, and the permutations to apply to each combined colouring
+# Output: a list of the colourings of B^k whose configuration differs from the configurations of all earlier colourings, the list of
+#         their configurations, and the amount of colourings. a colouring is given as [members, permutation], where members is the tuple
+#         of colourings of B it combines and permutation is applied to the combined colouring. expandCombinedColourings makes the
+#         colourings themselves, the configurations are combined from those of B
+def createCulledCombinations(Bk, combinations, BConfigurations, permutations):
+    culledColourings = []
+    culledConfigurations = []
+    seenConfigurations = set()
+    amount = 0
+    for members in combinations:
+        configuration = combineBConfigurations(Bk, [BConfigurations[m] for m in members])
+        for permutation in permutations:
+            amount += 1
+            permutedConfiguration = permuteConfiguration(configuration, permutation)
+            key = configurationKey(permutedConfiguration)
+            if key not in seenConfigurations:
+                seenConfigurations.add(key)
+                culledColourings.append([members, permutation])
+                culledConfigurations.append(permutedConfiguration)
+
+    return culledColourings, culledConfigurations, amount
+
+# Input: the graph B^k made by createCombinedBlock, a list of colourings of B^k made by createCulledCombinations and the list of colourings of B
+# Output: the list of these colourings in the form [colouring, permutation], where colourings of the same members share their list
+def expandCombinedColourings(Bk, combinations, BColourings):
+    combinedColourings = {}
+    colourings = []
+    for members, permutation in combinations:
+        if members not in combinedColourings:
+            combinedColourings[members] = combineBColourings(Bk, [BColourings[m] for m in members])
+        colourings.append([combinedColourings[members], permutation])
 
-    return adjacency
+    return colourings
 
-# Input: three colourings of B
-# Output: their combined colouring on B^3
-def combine3BColourings(c1, c2, c3):
-    leftColouring = []
-    middleColouring = []
-    rightColouring = []
+# Input: a block B and an odd amount of blocks k of at least 3
+# Output: the Loupekine snark made from k copies of B in a ring, where the right semiedges of each copy are connected to the left semiedges
+#         of the next. the spokes of the first three copies meet in a new central vertex, and the spokes of the other copies are joined in pairs
+#         of consecutive copies. as in createCombinedBlock, for each edge "memberEdges" contains the copy and the position of its edge in B,
+#         where an edge joining two copies belongs to the earlier copy
+def createLoupekineSnark(B, k):
+    Bk = createCombinedBlock(B, k)
+    centralVertex = k*(len(B["vertices"]) - 5)
 
-    i = 0
-    while i < BInternalEdges:
-        e = c1[i+1][0]
-        leftColouring.append(c1[i+1])
-        middleColouring.append([{min(e) + BInternalVertices, max(e) + BInternalVertices}, c2[i+1][1]])
-        rightColouring.append([{min(e) + 2*BInternalVertices, max(e) + 2*BInternalVertices}, c3[i+1][1]])
-        i += 1
-
-    combinedColouring = leftColouring + middleColouring + rightColouring
-
-    #colouring the connecting edges
-    combinedColouring.append([{min(c1[-2][0]), min(c2[-4][0]) + BInternalVertices}, c1[-2][1]])
-    combinedColouring.append([{min(c1[-1][0]), min(c2[-3][0]) + BInternalVertices}, c1[-1][1]])
-    combinedColouring.append([{min(c2[-2][0]) + BInternalVertices, min(c3[-4][0]) + 2*BInternalVertices}, c2[-2][1]])
-    combinedColouring.append([{min(c2[-1][0]) + BInternalVertices, min(c3[-3][0]) + 2*BInternalVertices}, c2[-1][1]])
-
-    #colouring the horizontal semiedges
-    combinedColouring.append([{min(c1[-4][0]), 3*BInternalVertices}, c1[-4][1]])
-    combinedColouring.append([{min(c1[-3][0]), 3*BInternalVertices + 1}, c1[-3][1]])
-    combinedColouring.append([{min(c3[-2][0]) + 2*BInternalVertices, 3*BInternalVertices + 2}, c3[-2][1]])
-    combinedColouring.append([{min(c3[-1][0]) + 2*BInternalVertices, 3*BInternalVertices + 3}, c3[-1][1]])
-
-    # colouring the vertical semiedges
-    combinedColouring.insert(0, [{min(c3[0][0]) + 2*BInternalVertices, 3*BInternalVertices + 6}, c3[0][1]])
-    combinedColouring.insert(0, [{min(c2[0][0]) + BInternalVertices, 3*BInternalVertices + 5}, c2[0][1]])
-    combinedColouring.insert(0, [{min(c1[0][0]), 3*BInternalVertices + 4}, c1[0][1]])
+    edges = []
+    memberEdges = []
+    for i in range(len(Bk["edges"])):
+        if i not in Bk["boundaryEdges"]:
+            edges.append(Bk["edges"][i])
+            memberEdges.append(Bk["memberEdges"][i])
+
+    for left, right in zip(Bk["leftSemiedges"], Bk["rightSemiedges"]):
+        edges.append({min(Bk["edges"][right]), min(Bk["edges"][left])})
+        memberEdges.append(Bk["memberEdges"][right])
+
+    for j in range(3):
+        edges.append({min(Bk["edges"][Bk["spokes"][j]]), centralVertex})
+        memberEdges.append(Bk["memberEdges"][Bk["spokes"][j]])
+    for j in range(3, k, 2):
+        edges.append({min(Bk["edges"][Bk["spokes"][j]]), min(Bk["edges"][Bk["spokes"][j+1]])})
+        memberEdges.append(Bk["memberEdges"][Bk["spokes"][j]])
+
+    return {"vertices": range(centralVertex + 1), "edges": edges, "memberEdges": memberEdges}
+
+# Input: the configurations of all colourings of a block B made by createAllBColourings, the directed graph of these colourings
+#        made by createColouringsGraph, an odd amount of blocks k of at least 3, and optionally the metrics made by createMetrics
+# Output: the positions of k colourings of B which together give a normal 5-edge-colouring of the snark made by createLoupekineSnark,
+#         or None if the snark has no normal 5-edge-colouring
+#         the graph of colourings is used as a transfer matrix around the ring of copies. for each colouring of the current copy we keep
+#         the set of colourings of the first copy from which it can be reached, as the bits of an integer, so the time grows linearly with k.
+#         the colours can be permuted such that the spokes at the central vertex have colours 0, 1 and 2, and the spokes that are joined
+#         need the same colour. the edges at the central vertex and the joined spokes are checked to be normal as each copy is added,
+#         the last copy has to attach to the colouring of the first copy its set comes from
+def createSnarkColouring(configurations, colouringsGraph, k, metrics = None):
+    if k < 3 or k % 2 == 0:
+        raise ValueError("a Loupekine snark needs an odd amount of at least 3 blocks, not " + str(k))
+    started = startStage(metrics, "createSnarkColouring")
+    spokeColours = []
+    spokeMasks = []
+    for configuration in configurations:
+        spokeColours.append(configuration[0][0])
+        spokeMasks.append(colourMask(configuration[0][1]))
+
+    firstColourings = [v for v in colouringsGraph["vertices"] if snarkCopyAllowed(spokeColours, spokeMasks, 0, None, v)]
+    layers = [{v: 1 << i for i, v in enumerate(firstColourings)}]
+    transitions = 0
+    for j in range(1, k):
+        layer = {}
+        for v, firsts in layers[-1].items():
+            for w in graphRow(colouringsGraph, v):
+                transitions += 1
+                if snarkCopyAllowed(spokeColours, spokeMasks, j, v, w):
+                    layer[w] = layer.get(w, 0) | firsts
+        layers.append(layer)
+        reportProgress(metrics, "snark copies", j + 1, k)
+
+    colouring = None
+    firstPositions = {v: i for i, v in enumerate(firstColourings)}
+    for v, firsts in layers[-1].items():
+        for w in graphRow(colouringsGraph, v):
+            if w in firstPositions and firsts >> firstPositions[w] & 1:
+                colouring = [w, v]
+                break
+        if colouring is not None:
+            break
+
+#   we go back through the copies to find colourings which attach to the chosen ones and are reached from the same first colouring
+    if colouring is not None:
+        firstBit = 1 << firstPositions[colouring[0]]
+        for j in range(k - 1, 1, -1):
+            w = colouring[-1]
+            for v, firsts in layers[j - 1].items():
+                if firsts & firstBit and hasEdge(colouringsGraph, v, w) and snarkCopyAllowed(spokeColours, spokeMasks, j, v, w):
+                    colouring.append(v)
+                    break
+        colouring = colouring[:1] + colouring[:0:-1]
+
+    finishStage(metrics, started, {"copies": k, "transitions": transitions, "reachable": [len(layer) for layer in layers]})
+    return colouring
+
+# Input: for each colouring of B the colour of its spoke and the colours adjacent to it as made by colourMask, the position j of a copy
+#        in the snark made by createLoupekineSnark, the colouring v of the previous copy or None, and the colouring w of copy j
+# Output: whether w can be the colouring of copy j after v: a spoke at the central vertex has colour j and is normal, and the spoke of the second
+#         copy of a joined pair has the colour of the first one, where the joined edge is normal
+def snarkCopyAllowed(spokeColours, spokeMasks, j, v, w):
+    if j < 3:
+        return spokeColours[w] == j and colourBitCount[spokeMasks[w] & (0b111 ^ (1 << j))] != 1
+    if (j - 3) % 2 == 1:
+        return spokeColours[v] == spokeColours[w] and colourBitCount[spokeMasks[v] & spokeMasks[w]] != 1
+    return True
 
-    return combinedColouring
+# Input: a directed graph G and a vertex v
+# Output: the increasing array of vertices v has an edge to
+def graphRow(G, v):
+    return G["targets"][G["offsets"][v]:G["offsets"][v+1]]
+
+# Input: a directed graph G and two vertices v and w
+# Output: whether G has an edge from v to w, found by a binary search in the row of v
+def hasEdge(G, v, w):
+    end = G["offsets"][v+1]
+    i = bisect_left(G["targets"], w, G["offsets"][v], end)
+    return i != end and G["targets"][i] == w
+
+# Input: the name of a file
+# Output: the file opened for writing a graph in the form read by openGraphFile, the header is filled in by finishGraphFile.
+#         after this the targets of the graph are written to it, as bytes of an array of type "i"
+def startGraphFile(fileName):
+    graphFile = open(fileName, "wb")
+    graphFile.write(bytes(16))
+    return graphFile
+
+# Input: a file made by startGraphFile to which all targets of a graph were written and the offsets of the graph
+# Output: none, the offsets and the header, which contains the amount of vertices and of edges, are written and the file is closed
+def finishGraphFile(graphFile, offsets):
+    graphFile.write(bytes(-graphFile.tell() % 8))
+    graphFile.write(offsets.tobytes())
+    graphFile.seek(0)
+    graphFile.write(array("q", [len(offsets) - 1, offsets[-1]]).tobytes())
+    graphFile.close()
+
+# Input: the name of a file, and the offsets and targets of a graph
+# Output: the graph written to this file and mapped from it by openGraphFile
+def writeGraphFile(fileName, offsets, targets):
+    graphFile = startGraphFile(fileName)
+    graphFile.write(targets.tobytes())
+    finishGraphFile(graphFile, offsets)
+    return openGraphFile(fileName)
+
+# Input: the name of a file and the offsets of a graph
+# Output: the graph with these offsets and all targets 0 written to this file and mapped from it by openGraphFile so that the targets
+#         can be changed, which lets the targets be put in their places in any order without holding them in memory
+def createGraphFile(fileName, offsets):
+    graphFile = startGraphFile(fileName)
+    graphFile.seek(4*offsets[-1], os.SEEK_CUR)
+    finishGraphFile(graphFile, offsets)
+    return openGraphFile(fileName, True)
+
+# Input: the name of a file written by startGraphFile and finishGraphFile, and optionally whether the graph can be changed
+# Output: a dictionary with the offsets and targets of the graph in the file, which are read from the file by the operating system
+#         when they are used instead of being loaded, and the name of the file under "file". the vertices are not stored in the file
+def openGraphFile(fileName, writable = False):
+    with open(fileName, "r+b" if writable else "rb") as graphFile:
+        data = memoryview(mmap.mmap(graphFile.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ))
+    vertexAmount, edgeAmount = data[:16].cast("q")
+    targetsEnd = 16 + 4*edgeAmount
+    offsetsStart = targetsEnd + (-targetsEnd % 8)
+
+    return {"offsets": data[offsetsStart:offsetsStart + 8*(vertexAmount + 1)].cast("q"), "targets": data[16:targetsEnd].cast("i"), "file": fileName}
+
+# Input: an iterable of colourings of the same graph G, and G
+# Output: a list of the colourings whose configuration differs from the configurations of all earlier colourings, the list of their
+#         configurations, and the amount of colourings. the colourings are taken one at a time, and a colouring with the configuration
+#         of an earlier colouring is not kept, so only the colourings that are left out are ever in memory together
+def createCulledColourings(colourings, G):
+    if numpy is not None:
+        return createCulledColouringsMatrix(colourings, G)
 
-# Input: a list of colourings of the same graph and the list of their configurations
-# Output: a copy of the list of colourings and configurations where colourings with a duplicate configuration are removed
-def cullColourings(colourings, configurations):
     culledColourings = []
-    for c in colourings:
-        culledColourings.append(copyColouring(c))
-
-    culledConfigurations = copyConfigurations(configurations)
-
-    i = 0
-    while i < len(culledColourings):
-        j = i+1
-        while j < len(culledColourings):
-            if culledConfigurations[i] == culledConfigurations[j]:
-                    culledColourings.pop(j)
-                    culledConfigurations.pop(j)
-            else:
-                j += 1
-        i += 1
-
-    return culledColourings, culledConfigurations
-
-# Input: a list of configurations of colourings of a graph
-# Output: a copy of that list of configurations
-def copyConfigurations(configurations):
-    configurationsCopy = []
-    for c in configurations:
-        cCopy = []
-        for e in c:
-            eCopy = [e[0],[]]
-            for v in e[1]:
-                eCopy[1].append(v)
-            cCopy.append(eCopy)
-        configurationsCopy.append(cCopy)
-
-    return configurationsCopy
-
-# Input: a directed graph of B^2- and B^3-colourings
+    culledConfigurations = []
+    seenConfigurations = set()
+    amount = 0
+    for colouring in colourings:
+        amount += 1
+        configuration = createConfiguration(colouring, G)
+        key = configurationKey(configuration)
+        if key not in seenConfigurations:
+            seenConfigurations.add(key)
+            culledColourings.append(colouring)
+            culledConfigurations.append(configuration)
+
+    return culledColourings, culledConfigurations, amount
+
+# Input: an iterable of colourings of the same block G, and G
+# Output: the same as createCulledColourings. the colourings are taken in batches, whose configurations are read at once by
+#         createConfigurationMatrix. a row of this matrix holds the colours of a configuration in order, so equal rows are equal configurations,
+#         and only the first row of each configuration in the batch is compared with the earlier batches
+def createCulledColouringsMatrix(colourings, G):
+    culledColourings = []
+    culledConfigurations = []
+    seenConfigurations = set()
+    amount = 0
+    colourings = iter(colourings)
+    while True:
+        batch = list(itertools.islice(colourings, colouringBatchSize))
+        if not batch:
+            break
+        amount += len(batch)
+        matrix = createConfigurationMatrix(batch, G)
+        firstRows = numpy.sort(numpy.unique(matrix, axis=0, return_index=True)[1])
+        for i in firstRows.tolist():
+            key = matrix[i].tobytes()
+            if key not in seenConfigurations:
+                seenConfigurations.add(key)
+                culledColourings.append(batch[i])
+                culledConfigurations.append(configurationFromRow(matrix[i].tolist(), G))
+
+    return culledColourings, culledConfigurations, amount
+
+# Input: a configuration
+# Output: an immutable copy of the configuration which can be hashed, two configurations are equal if and only if their keys are equal
+def configurationKey(configuration):
+    return tuple((e[0], tuple(e[1])) for e in configuration)
+
+# Input: a configuration of a B^2- or B^3-colouring
+# Output: the colours of its spokes as a string, like "00" or "012"
+def spokeType(configuration):
+    if len(configuration) == 6:
+        return str(configuration[0][0]) + str(configuration[1][0])
+    return str(configuration[0][0]) + str(configuration[1][0]) + str(configuration[2][0])
+
+# Input: a directed graph of B^2- and B^3-colourings, the list of their configurations, the amount of processes to use for the first pass,
+#        optionally the metrics made by createMetrics, optionally a file to store the new graph in, and whether to stop as soon as
+#        the final set is known to miss a kind of self-attaching colouring or of edge that analyseBlock checks for
 # Output: a subgraph of this graph such that the colourings of its remaining vertices obey conditions (5) and (6) from the thesis
-def createTriangleGraph(colouringsGraph):
+#         the edges are checked in order and an edge that fails the check causes one of its ends to be removed, until all edges
+#         pass. an edge that passed only has to be checked again if one of the colourings completing its triangles was removed,
+#         so we only revisit those edges, in the same order as repeated passes over all edges would, which gives the same subgraph
+#         when asked to stop, the graph has "missingClass", the kind from selfAdjacentClasses or edgeClasses which has no colouring
+#         or edge left, or None. vertices are only removed, so such a kind would be missing from the final set as well. if the
+#         reduction stopped early the graph is the graph at that moment, which is not the final subgraph
+#         with a checkpoint file, the state of the reduction is written to it by writeCompressedFile at most every checkpointInterval
+#         seconds, between two rows, so runs sharing the file each replace it with a complete checkpoint. when resuming, the reduction
+#         continues from the state in the file if there is one, which gives the same subgraph as an uninterrupted run. the file is
+#         removed when the reduction is done, and kept when it stopped early. with two index files, the rows of the index made by
+#         createTriangleIndex are kept in these files instead of in memory, and with two witness files so are the arrays of the lists
+#         made by createWitnessLists
+def createTriangleGraph(colouringsGraph, configurations, workers = 1, metrics = None, fileName = None, decide = False,
+                        checkpointFile = None, checkpointInterval = 600, resume = False, indexFiles = None, witnessFiles = None):
+    started = startStage(metrics, "createTriangleGraph")
     newVertices = colouringsGraph["vertices"].copy()
-    adjacency = createAdjacency(colouringsGraph)
-    lenAdjacency = len(adjacency)
-
-    allGood = False
+    offsets = colouringsGraph["offsets"]
+    targets = colouringsGraph["targets"]
+    lenAdjacency = len(newVertices)
+
+#   only whole vertices are removed, so instead of changing the graph we mark them in removed. the edges are numbered by their
+#   position in targets: passed[a] is 1 if the edge a passed its last check and failed[a] if it failed, and the edges for which
+#   a colouring was found to complete a triangle are kept in witnessLists
+    removed = bytearray(lenAdjacency)
+    passed = bytearray(len(targets))
+    failed = bytearray(len(targets))
+    triangleIndex = createTriangleIndex(colouringsGraph, configurations, indexFiles)
+    witnessLists = createWitnessLists(colouringsGraph, triangleIndex["spokeTypes"], witnessFiles)
+
+    checkpoint = None
+    if checkpointFile is not None and resume:
+        checkpoint = readCompressedFile(checkpointFile)
+        if checkpoint is not None and (checkpoint["stage"] != "createTriangleGraph" or checkpoint["edges"] != len(targets)):
+            checkpoint = None
+
+#   with more than one process the edges are first all checked in parallel on the whole graph. removing vertices never makes
+#   an edge pass, so an edge that failed fails again when we get to it, and an edge that passed is checked again when we get to it
+#   if one of its triangles was lost
+    if workers > 1 and checkpoint is None:
+        ranges = rowRanges(lenAdjacency, workers)
+        with ProcessPoolExecutor(workers, initializer=initialiseWorker, initargs=({"triangleIndex": sendableTriangleIndex(triangleIndex), "graph": sendableGraph(colouringsGraph)},)) as executor:
+            for r, (rowFailed, rowWitnesses) in zip(ranges, executor.map(triangleGraphWorker, ranges)):
+                position = 0
+                for a in range(offsets[r[0]], offsets[r[1]]):
+                    if rowFailed[a - offsets[r[0]]]:
+                        failed[a] = 1
+                    else:
+                        passed[a] = 1
+                        witnessAmount = witnessLists["offsets"][a+1] - witnessLists["offsets"][a]
+                        addWitnesses(witnessLists, a, rowWitnesses[position:position + witnessAmount])
+                        position += witnessAmount
+                reportProgress(metrics, "checking edges", r[1], lenAdjacency)
+
+#   for the metrics we count the edges checked by hasTriangles and the vertices removed in each loop
+    edgesChecked = 0
+    verticesRemoved = []
+    progressStep = max(1, lenAdjacency // 100)
+    rows = list(range(lenAdjacency))
+    nextRows = set()
     loopNumber = 0
-    while not allGood:
-        loopNumber += 1
-        allGood = True
-        for i in range(lenAdjacency):
-            if (i+1) % round(lenAdjacency/100) == 0:
-                print("\rloop " + str(loopNumber) + ": " + str(round((i+1)/lenAdjacency*100)) + "%", end="", flush=True)
-
-            j = 0
-            while j < len(adjacency[i]):
-                v = adjacency[i][j]
-                if not hasTriangles(adjacency, [i, v]):
-                    allGood = False
-                    if contains(adjacency[i], i):
+    if checkpoint is not None:
+        removed = checkpoint["removed"]
+        passed = checkpoint["passed"]
+        failed = checkpoint["failed"]
+        loadWitnessLists(witnessLists, checkpoint["witnessLists"])
+        rows = checkpoint["rows"]
+        queuedRows = checkpoint["queuedRows"]
+        nextRows = checkpoint["nextRows"]
+        loopNumber = checkpoint["loopNumber"]
+        verticesRemoved = checkpoint["verticesRemoved"]
+        edgesChecked = checkpoint["edgesChecked"]
+        for v in range(lenAdjacency):
+            if removed[v]:
+                newVertices[v] = -1
+
+#   to decide early we count for each kind of self-attaching colouring and of edge how many are left. a checkpoint written
+#   without deciding has no counts, so they are counted again on the vertices it did not remove
+    missingClass = None
+    classCounts = None
+    if decide:
+        if checkpoint is not None:
+            classCounts = checkpoint["classCounts"]
+        if classCounts is None:
+            classCounts = countClasses(triangleIndex, removed)
+        if 0 in classCounts:
+            missingClass = (selfAdjacentClasses + edgeClasses)[classCounts.index(0)]
+            rows = []
+            nextRows = set()
+    lastCheckpoint = time.monotonic()
+
+    while rows:
+        if checkpoint is None:
+            loopNumber += 1
+            verticesRemoved.append(0)
+            queuedRows = set(rows)
+            heapq.heapify(rows)
+        checkpoint = None
+        while rows:
+            if checkpointFile is not None and time.monotonic() - lastCheckpoint >= checkpointInterval:
+                writeCompressedFile(checkpointFile, {"stage": "createTriangleGraph", "edges": len(targets), "loopNumber": loopNumber,
+                                                     "removed": removed, "passed": passed, "failed": failed, "witnessLists": saveWitnessLists(witnessLists),
+                                                     "rows": rows, "queuedRows": queuedRows, "nextRows": nextRows, "verticesRemoved": verticesRemoved,
+                                                     "edgesChecked": edgesChecked, "classCounts": classCounts})
+                lastCheckpoint = time.monotonic()
+            i = heapq.heappop(rows)
+            if (i+1) % progressStep == 0 and i+1 < lenAdjacency:
+                reportProgress(metrics, "loop " + str(loopNumber), i+1, lenAdjacency)
+
+            a = offsets[i]
+            while a < offsets[i+1] and not removed[i]:
+                v = targets[a]
+                if removed[v] or passed[a]:
+                    a += 1
+                    continue
+
+                witnesses = []
+                if not failed[a]:
+                    edgesChecked += 1
+                if failed[a] or not hasTriangles(triangleIndex, removed, [i, v], witnesses):
+                    if hasEdge(colouringsGraph, i, i):
                         vertexToRemove = v
                     else:
                         vertexToRemove = i
 
+                    if decide:
+                        missingClass = removeClassWitnesses(classCounts, triangleIndex, removed, vertexToRemove)
                     newVertices[vertexToRemove] = -1
-                    adjacency[vertexToRemove].clear()
-                    for w in adjacency:
-                        if contains(w, vertexToRemove):
-                            w.remove(vertexToRemove)
+                    removed[vertexToRemove] = 1
+                    verticesRemoved[-1] += 1
+                    if missingClass is not None:
+                        rows = []
+                        nextRows = set()
+                        break
+
+#                   the edges that lost a colouring completing one of their triangles are checked again, in this pass if
+#                   we did not get past them yet and otherwise in the next one
+                    for b in popWitnessedEdges(witnessLists, vertexToRemove):
+                        u = bisect_right(offsets, b) - 1
+                        if passed[b] and not removed[u] and not removed[targets[b]]:
+                            passed[b] = 0
+                            if u > i:
+                                if u not in queuedRows:
+                                    queuedRows.add(u)
+                                    heapq.heappush(rows, u)
+                            elif u < i or targets[b] < v:
+                                nextRows.add(u)
                 else:
-                    j += 1
-
-    for v in newVertices:
-        if v != -1 and adjacency[v] == []:
-            newVertices[v] = -1
-
-    newEdges = []
-    for i in range(len(adjacency)):
-        for v in adjacency[i]:
-            newEdges.append([i, v])
-
-    newGraph = {"vertices": newVertices, "edges": newEdges}
+                    passed[a] = 1
+                    addWitnesses(witnessLists, a, witnesses)
+                a += 1
+
+        reportProgress(metrics, "loop " + str(loopNumber), lenAdjacency, lenAdjacency)
+        rows = list(nextRows)
+        nextRows = set()
+
+    newOffsets = array("q", [0])
+    newTargets = array("i")
+    for v in range(lenAdjacency):
+        if not removed[v]:
+            for w in graphRow(colouringsGraph, v):
+                if not removed[w]:
+                    newTargets.append(w)
+            if len(newTargets) == newOffsets[-1]:
+                newVertices[v] = -1
+        newOffsets.append(len(newTargets))
+
+#   the checkpoint is only removed once the reduction is done, a run that stopped early leaves it for a run that finishes.
+#   another run sharing the cache can have removed the checkpoint already
+    if checkpointFile is not None and missingClass is None:
+        try:
+            os.remove(checkpointFile)
+        except FileNotFoundError:
+            pass
+
+    finishStage(metrics, started, {"edges": len(targets), "edgesChecked": edgesChecked, "loops": loopNumber,
+                                   "verticesRemovedPerLoop": verticesRemoved, "edgesLeft": len(newTargets)})
+    if fileName is not None:
+        newGraph = writeGraphFile(fileName, newOffsets, newTargets)
+        newGraph["vertices"] = newVertices
+    else:
+        newGraph = {"vertices": newVertices, "offsets": newOffsets, "targets": newTargets}
+    if decide:
+        newGraph["missingClass"] = missingClass
     return newGraph
 
-# Input: the adjacency of a directed graph of of B^2- and B^3-colourings, and an edge in that graph
-# Output: whether the colourings of this edge obey conditions (5) and (6) from the thesis
-def hasTriangles(adjacency, edge):
-    if len(configurations[edge[0]]) == 7 and len(configurations[edge[1]]) == 7 and configurations[edge[0]][1][0] == 0 and configurations[edge[1]][1][0] == 0:
-        goodEdge = False
-        triangles = {"012": [], "021": [], "102": [], "120": [], "201": [], "210": []}
-        for v in adjacency[edge[0]]:
-            if len(configurations[v]) == 7:
-                if contains(adjacency[v], edge[1]):
-                    triangles[str(configurations[v][0][0]) + str(configurations[v][1][0]) + str(configurations[v][2][0])].append(v)
-                    goodEdge = True
-                    for i in triangles:
-                        if triangles[i] == []: goodEdge = False
-                    if goodEdge: break
-
-        if not goodEdge:
-            for i in triangles:
-                if triangles[i] == []: return False
-
-    elif len(configurations[edge[0]]) == 7 and len(configurations[edge[1]]) == 7 and configurations[edge[0]][1][0] in {0, 1} and configurations[edge[1]][1][0] in {0, 1}:
-        goodEdge = False
-        triangles = {"012": [], "021": [], "120": [], "210": []}
-        for v in adjacency[edge[0]]:
-            if len(configurations[v]) == 7 and configurations[v][1][0] in {1, 2}:
-                if contains(adjacency[v], edge[1]):
-                    triangles[str(configurations[v][0][0]) + str(configurations[v][1][0]) + str(configurations[v][2][0])].append(v)
-                    goodEdge = True
-                    for i in triangles:
-                        if triangles[i] == []: goodEdge = False
-                    if goodEdge: break
-
-        if not goodEdge:
-            for i in triangles:
-                if triangles[i] == []: return False
-
-    elif len(configurations[edge[0]]) == 7 and len(configurations[edge[1]]) == 7:
-        goodEdge = False
-        triangles = {"021": [], "120": []}
-        for v in adjacency[edge[0]]:
-            if len(configurations[v]) == 7 and configurations[v][1][0] == 2:
-                if contains(adjacency[v], edge[1]):
-                    triangles[str(configurations[v][0][0]) + str(configurations[v][1][0]) + str(configurations[v][2][0])].append(v)
-                    goodEdge = True
-                    for i in triangles:
-                        if triangles[i] == []: goodEdge = False
-                    if goodEdge: break
-
-        if not goodEdge:
-            for i in triangles:
-                if triangles[i] == []: return False
-
-    goodEdge = False
-    triangles = {"00": [], "11": [], "22": []}
-    for v in adjacency[edge[0]]:
-        if len(configurations[v]) == 6:
-            if contains(adjacency[v], edge[1]):
-                triangles[str(configurations[v][0][0]) + str(configurations[v][1][0])].append(v)
-                goodEdge = True
-                for i in triangles:
-                    if triangles[i] == []: goodEdge = False
-                if goodEdge: break
-
-    if not goodEdge:
-        for i in triangles:
-            if triangles[i] == []: return False
-
-    return True
+# Input: the index of a directed graph G of B^2- and B^3-colourings made by createTriangleIndex and optionally the vertices removed
+#        from G as marked by createTriangleGraph
+# Output: a list with for each kind in selfAdjacentClasses the amount of vertices of that kind with an edge to themselves,
+#         followed by the amount of edges of each kind in edgeClasses, among the vertices which are not removed
+def countClasses(triangleIndex, removed = None):
+    spokeTypes = triangleIndex["spokeTypes"]
+    if removed is None:
+        removed = bytearray(len(spokeTypes))
+    classCounts = [0] * (len(selfAdjacentClasses) + len(edgeClasses))
+    for v in range(len(spokeTypes)):
+        if removed[v]:
+            continue
+        s = spokeTypes[v]
+        if hasClassifiedEdge(triangleIndex["out"], v, v, s):
+            classCounts[s] += 1
+        for t in range(len(selfAdjacentClasses)):
+            if edgeClassIndex[s][t] != -1:
+                classCounts[edgeClassIndex[s][t]] += classifiedRowAmount(triangleIndex["out"], removed, v, t)
+
+    return classCounts
+
+# Input: the counts made by countClasses, the index of a directed graph G made by createTriangleIndex, the vertices removed from G as
+#        marked by createTriangleGraph, and a vertex which is about to be removed
+# Output: a kind whose count became 0 or None. the counts are lowered by the self-attaching colouring and the edges lost with the vertex,
+#         which are counted in the rows of the vertex in the index for each kind of the other end
+def removeClassWitnesses(classCounts, triangleIndex, removed, vertex):
+    lostClasses = []
+    s = triangleIndex["spokeTypes"][vertex]
+    selfAdjacent = hasClassifiedEdge(triangleIndex["out"], vertex, vertex, s)
+    if selfAdjacent:
+        lostClasses.append((s, 1))
+    for t in range(len(selfAdjacentClasses)):
+        if edgeClassIndex[s][t] != -1:
+            lostClasses.append((edgeClassIndex[s][t], classifiedRowAmount(triangleIndex["out"], removed, vertex, t)))
+        if edgeClassIndex[t][s] != -1:
+            amount = classifiedRowAmount(triangleIndex["in"], removed, vertex, t)
+            if t == s and selfAdjacent:
+                amount -= 1
+            lostClasses.append((edgeClassIndex[t][s], amount))
+
+    missingClass = None
+    for c, amount in lostClasses:
+        if amount != 0:
+            classCounts[c] -= amount
+            if classCounts[c] == 0 and missingClass is None:
+                missingClass = (selfAdjacentClasses + edgeClasses)[c]
+
+    return missingClass
+
+# Input: the rows of a graph made by classifyRows, two vertices v and w, and the position c of the kind of w in selfAdjacentClasses
+# Output: whether the graph has an edge from v to w, found by a binary search in the vertices of kind c in the row of v
+def hasClassifiedEdge(classifiedRows, v, w, c):
+    position = v*len(selfAdjacentClasses) + c
+    end = classifiedRows["offsets"][position + 1]
+    i = bisect_left(classifiedRows["targets"], w, classifiedRows["offsets"][position], end)
+    return i != end and classifiedRows["targets"][i] == w
+
+# Input: the rows of a graph made by classifyRows, the vertices removed from the graph as marked by createTriangleGraph, a vertex v
+#        and the position c of a kind in selfAdjacentClasses
+# Output: the amount of vertices of kind c in the row of v which are not removed
+def classifiedRowAmount(classifiedRows, removed, v, c):
+    position = v*len(selfAdjacentClasses) + c
+    start = classifiedRows["offsets"][position]
+    end = classifiedRows["offsets"][position + 1]
+    return end - start - sum(removed[w] for w in classifiedRows["targets"][start:end])
+
+# Input: the amount of rows of a graph and the amount of processes
+# Output: a list of ranges [start, end) of rows which cover all rows, with a few ranges for each process to spread the work
+def rowRanges(rowAmount, workers):
+    rangeAmount = min(rowAmount, 8*workers)
+    ranges = []
+    for i in range(rangeAmount):
+        ranges.append((i * rowAmount // rangeAmount, (i+1) * rowAmount // rangeAmount))
+
+    return ranges
+
+# data sent once to each worker process by initialiseWorker
+workerData = {}
+
+# Input: a directed graph
+# Output: the graph in a form that can be sent to a worker process. a graph mapped from a file is sent as the name of the file,
+#         so the workers map the same file instead of each getting a copy
+def sendableGraph(G):
+    if "file" in G:
+        return {"file": G["file"]}
+    return G
 
-# Input: a sorted list of integers and an integer x
-# Output: whether this list contains x
-def contains(list, x):
-    i = bisect_left(list, x)
-    return i != len(list) and list[i] == x
+# Input: a graph made by sendableGraph
+# Output: the graph, mapped from its file if it was sent as the name of a file
+def receivedGraph(G):
+    if "offsets" not in G:
+        return openGraphFile(G["file"])
+    return G
 
+# Input: a dictionary with the data the worker process needs
+# Output: none, the data is stored in the worker process
+def initialiseWorker(data):
+    workerData.update(data)
+    if "graph" in data:
+        workerData["graph"] = receivedGraph(data["graph"])
+    if "triangleIndex" in data:
+        triangleIndex = data["triangleIndex"]
+        workerData["triangleIndex"] = {"spokeTypes": triangleIndex["spokeTypes"], "out": receivedGraph(triangleIndex["out"]),
+                                       "in": receivedGraph(triangleIndex["in"])}
+
+# Input: a range [start, end) of rows
+# Output: the rows of the colourings graph of the configurations of the worker in this range, as made by createColouringsGraphRows
+def colouringsGraphWorker(rows):
+    if "graphIndex" not in workerData:
+        workerData["graphIndex"] = createColouringsGraphIndex(workerData["configurations"])
+
+    return colouringsGraphRows(workerData["graphIndex"], rows[0], rows[1])
+
+# Input: a range [start, end) of rows
+# Output: for each edge of the graph of the worker starting in this range, in the order of the targets of the graph, whether it does
+#         not obey conditions (5) and (6), and an array with the witnesses found by hasTriangles for the other edges one after the other
+def triangleGraphWorker(rows):
+    triangleIndex = workerData["triangleIndex"]
+    G = workerData["graph"]
+    removed = bytearray(len(G["offsets"]) - 1)
+    start = G["offsets"][rows[0]]
+    failed = bytearray(G["offsets"][rows[1]] - start)
+    witnesses = array("i")
+    for i in range(rows[0], rows[1]):
+        for a in range(G["offsets"][i], G["offsets"][i+1]):
+            edgeWitnesses = []
+            if hasTriangles(triangleIndex, removed, [i, G["targets"][a]], edgeWitnesses):
+                witnesses.extend(edgeWitnesses)
+            else:
+                failed[a - start] = 1
+
+    return failed, witnesses
+
+# Input: a directed graph G of B^2- and B^3-colourings, for each vertex the position of its spoke type in selfAdjacentClasses and
+#        optionally the names of two files
+# Output: the lists used by createTriangleGraph of the edges for which each vertex completes a triangle. every edge a has a slot for each
+#         kind in triangleClasses, from "offsets"[a] up to "offsets"[a+1], for the colouring hasTriangles found for that kind. the slots with
+#         the same colouring w form a list starting at "first"[w], where "next"[s] is 0 if slot s is in no list, and otherwise 1 if s is the
+#         last slot of its list, or the next slot plus 2. "first"[w] is 1 if the list of w is empty, and otherwise its first slot plus 2.
+#         "offsets" and "next" are written to the first and the second file by createZeroArray
+def createWitnessLists(G, spokeTypes, fileNames = None):
+    if fileNames is None:
+        fileNames = [None, None]
+    witnessOffsets = createZeroArray("q", len(G["targets"]) + 1, fileNames[0])
+    a = 0
+    for v in range(len(G["offsets"]) - 1):
+        vertexClasses = triangleClasses[spokeTypes[v]]
+        for w in graphRow(G, v):
+            witnessOffsets[a+1] = witnessOffsets[a] + len(vertexClasses[spokeTypes[w]])
+            a += 1
+
+#   the slots are numbered like the edges, but there are more of them
+    slotType = "i" if witnessOffsets[-1] + 2 < 2**31 else "q"
+    return {"offsets": witnessOffsets, "next": createZeroArray(slotType, witnessOffsets[-1], fileNames[1]),
+            "first": array(slotType, [1]) * (len(G["offsets"]) - 1)}
+
+# Input: lists made by createWitnessLists, an edge a which passed the check of hasTriangles and the witnesses found for it
+# Output: none, the slots of the edge are added to the lists of their witnesses. a slot which is still in a list keeps its witness,
+#         since hasTriangles finds the smallest colouring of each kind which completes a triangle, and that only changes when it is removed
+def addWitnesses(witnessLists, a, witnesses):
+    nextSlots = witnessLists["next"]
+    firstSlots = witnessLists["first"]
+    s = witnessLists["offsets"][a]
+    for w in witnesses:
+        if nextSlots[s] == 0:
+            nextSlots[s] = firstSlots[w]
+            firstSlots[w] = s + 2
+        s += 1
+
+# Input: lists made by createWitnessLists and a vertex w
+# Output: a generator of the edges for which w was found to complete a triangle. the slots are taken out of the list of w as they are given
+def popWitnessedEdges(witnessLists, w):
+    nextSlots = witnessLists["next"]
+    link = witnessLists["first"][w]
+    witnessLists["first"][w] = 1
+    while link != 1:
+        s = link - 2
+        link = nextSlots[s]
+        nextSlots[s] = 0
+        yield bisect_right(witnessLists["offsets"], s) - 1
+
+# Input: lists made by createWitnessLists
+# Output: the contents of the lists which can change, as bytes for a checkpoint
+def saveWitnessLists(witnessLists):
+    return {"next": memoryview(witnessLists["next"]).tobytes(), "first": witnessLists["first"].tobytes()}
+
+# Input: lists made by createWitnessLists for the same graph as a checkpoint, and the contents saved in it by saveWitnessLists
+# Output: none, the lists get these contents
+def loadWitnessLists(witnessLists, data):
+    memoryview(witnessLists["next"]).cast("B")[:] = data["next"]
+    memoryview(witnessLists["first"]).cast("B")[:] = data["first"]
+
+# Input: a type code of an array, a length and optionally the name of a file
+# Output: an array of this type and length with all entries 0. with a file the array is mapped from the file, which is made for it,
+#         so it can be changed without being kept in memory
+def createZeroArray(typeCode, length, fileName = None):
+    if fileName is None:
+        return array(typeCode, [0]) * length
+
+    itemSize = array(typeCode).itemsize
+    with open(fileName, "w+b") as arrayFile:
+        arrayFile.truncate(max(1, itemSize*length))
+        data = memoryview(mmap.mmap(arrayFile.fileno(), 0))
+    return data[:itemSize*length].cast(typeCode)
+
+# Input: a directed graph G of B^2- and B^3-colourings, the list of their configurations and optionally the names of two files
+# Output: the index used by hasTriangles: "spokeTypes" contains for each vertex the position of its spoke type in selfAdjacentClasses,
+#         "out" contains the rows of G and "in" those of the graph with all edges reversed, each split by the kind of the vertices
+#         as made by classifyRows, and written to the first and the second file
+def createTriangleIndex(G, configurations, fileNames = None):
+    spokeTypes = array("b", [selfAdjacentClasses.index(spokeType(c)) for c in configurations])
+    if fileNames is None:
+        fileNames = [None, None]
+    return {"spokeTypes": spokeTypes, "out": classifyRows(G, spokeTypes, False, fileNames[0]),
+            "in": classifyRows(G, spokeTypes, True, fileNames[1])}
+
+# Input: an index made by createTriangleIndex
+# Output: the index in a form that can be sent to a worker process, with its rows sent as by sendableGraph
+def sendableTriangleIndex(triangleIndex):
+    return {"spokeTypes": triangleIndex["spokeTypes"], "out": sendableGraph(triangleIndex["out"]), "in": sendableGraph(triangleIndex["in"])}
+
+# Input: a directed graph G, for each vertex the position of its kind in selfAdjacentClasses, whether to use the graph with all edges
+#        of G reversed instead of G, and optionally the name of a file
+# Output: the rows of this graph with the vertices of each row ordered by their kind and then increasing, in "targets", where the vertices
+#         of kind c in the row of v start at "offsets"[v*len(selfAdjacentClasses) + c]. the vertices of each kind in each row are counted
+#         first, and then every edge of G is put in its place, in the order of G so that every kind in a row stays increasing. so G is
+#         only read, and with a file the targets are put in their places in the file as made by createGraphFile instead of in memory
+def classifyRows(G, spokeTypes, reverse = False, fileName = None):
+    classAmount = len(selfAdjacentClasses)
+    vertexAmount = len(G["offsets"]) - 1
+    offsets = array("q", [0]) * (vertexAmount*classAmount + 1)
+    for v in range(vertexAmount):
+        if reverse:
+            position = spokeTypes[v] + 1
+            for w in graphRow(G, v):
+                offsets[w*classAmount + position] += 1
+        else:
+            position = v*classAmount + 1
+            for w in graphRow(G, v):
+                offsets[position + spokeTypes[w]] += 1
+    for i in range(1, len(offsets)):
+        offsets[i] += offsets[i-1]
+
+    if fileName is not None:
+        classifiedRows = createGraphFile(fileName, offsets)
+    else:
+        classifiedRows = {"offsets": offsets, "targets": array("i", [0]) * offsets[-1]}
+    targets = classifiedRows["targets"]
+    nextPositions = offsets[:-1]
+    for v in range(vertexAmount):
+        if reverse:
+            position = spokeTypes[v]
+            for w in graphRow(G, v):
+                targets[nextPositions[w*classAmount + position]] = v
+                nextPositions[w*classAmount + position] += 1
+        else:
+            position = v*classAmount
+            for w in graphRow(G, v):
+                targets[nextPositions[position + spokeTypes[w]]] = w
+                nextPositions[position + spokeTypes[w]] += 1
 
+    return classifiedRows
 
-if __name__ == '__main__':
-#   enter the block you want to test below by selecting a snark, a path of three vertices to remove, and whether the block crossed
-#   if needed you can add a snark at the top to be able to make blocks from that snark
-    B = createBlock(petersenGraph, [2, 0, 3], False)
+# Input: the index of a directed graph of B^2- and B^3-colourings made by createTriangleIndex, the vertices removed from the graph
+#        as marked by createTriangleGraph, and an edge in that graph between vertices which are not removed
+#        optionally a list to which for each kind of triangle the first colouring completing such a triangle is added
+# Output: whether the colourings of this edge obey conditions (5) and (6) from the thesis
+#         for each kind of colouring in triangleClasses that has to complete a triangle, the colourings of that kind with an edge from the
+#         first colouring of the edge and those with an edge to the second one are both increasing, so the first colouring in both that
+#         is not removed is found by going through the shorter one and searching each colouring in the longer one
+def hasTriangles(triangleIndex, removed, edge, witnesses=None):
+    spokeTypes = triangleIndex["spokeTypes"]
+    outOffsets = triangleIndex["out"]["offsets"]
+    outTargets = triangleIndex["out"]["targets"]
+    inOffsets = triangleIndex["in"]["offsets"]
+    inTargets = triangleIndex["in"]["targets"]
+    classAmount = len(selfAdjacentClasses)
+
+    triangles = []
+    for c in triangleClasses[spokeTypes[edge[0]]][spokeTypes[edge[1]]]:
+        outStart = outOffsets[edge[0]*classAmount + c]
+        outEnd = outOffsets[edge[0]*classAmount + c + 1]
+        inStart = inOffsets[edge[1]*classAmount + c]
+        inEnd = inOffsets[edge[1]*classAmount + c + 1]
+        if outEnd - outStart <= inEnd - inStart:
+            shortTargets, shortStart, shortEnd, longTargets, longStart, longEnd = outTargets, outStart, outEnd, inTargets, inStart, inEnd
+        else:
+            shortTargets, shortStart, shortEnd, longTargets, longStart, longEnd = inTargets, inStart, inEnd, outTargets, outStart, outEnd
+
+        witness = -1
+        for a in range(shortStart, shortEnd):
+            v = shortTargets[a]
+            if not removed[v]:
+                longStart = bisect_left(longTargets, v, longStart, longEnd)
+                if longStart == longEnd:
+                    break
+                if longTargets[longStart] == v:
+                    witness = v
+                    break
+        if witness == -1:
+            return False
+        triangles.append(witness)
 
-    BInternalVertices = len(B["vertices"]) - 5
-    BInternalEdges = len(B["edges"]) - 5
-
-#   first we create all colourings of a single block
-    print("creating B colourings...")
-    B0Colourings, B1Colourings, B2Colourings = createBColourings(B)
-    BColourings = B0Colourings + B1Colourings + B2Colourings
-    print("B colourings: " + str(len(BColourings)))
-
-#   we then create the list of configurations of these colourings
-    B0Configurations = createConfigurations(B0Colourings, [B["edges"][0], B["edges"][-4], B["edges"][-3], B["edges"][-2], B["edges"][-1]])
-    B1Configurations = createConfigurations(B1Colourings, [B["edges"][0], B["edges"][-4], B["edges"][-3], B["edges"][-2], B["edges"][-1]])
-    B2Configurations = createConfigurations(B2Colourings, [B["edges"][0], B["edges"][-4], B["edges"][-3], B["edges"][-2], B["edges"][-1]])
-    BConfigurations = B0Configurations + B1Configurations + B2Configurations
-
-#   we remove colours with duplicated configurations
-    BColourings, BConfigurations = cullColourings(BColourings, BConfigurations)
-    print("after culling: " + str(len(BColourings)))
-
-    B0Colourings, B0Configurations = cullColourings(B0Colourings, B0Configurations)
-
-#   we then create all B2-colourings, create the list of their configurations, and remove duplicates
-    B0ColouringsGraph = createColouringsGraph(B0Configurations)
-    B2Colourings = createB2Colourings(B0ColouringsGraph, B0Colourings)
-    print("B2 colourings: " + str(len(B2Colourings)))
-
-    B2Configurations = createConfigurations(B2Colourings, [{min(B["edges"][0]), 2*BInternalVertices + 4},
-                                                           {min(B["edges"][0]) + BInternalVertices, 2*BInternalVertices + 5},
-                                                           {min(B["edges"][-4]), 2*BInternalVertices},
-                                                           {min(B["edges"][-3]), 2*BInternalVertices + 1},
-                                                           {min(B["edges"][-2]) + BInternalVertices, 2*BInternalVertices + 2},
-                                                           {min(B["edges"][-1]) + BInternalVertices, 2*BInternalVertices + 3}])
-
-    B2Colourings, B2Configurations = cullColourings(B2Colourings, B2Configurations)
-    print("after culling: " + str(len(B2Colourings)))
-
-#   we do the same for the B3-configurations
-    BColouringsGraph = createColouringsGraph(BConfigurations)
-    B3Colourings = createB3Colourings(BColouringsGraph, BColourings)
-    print("B3 colourings: " + str(len(B3Colourings)))
-
-    B3Configurations = createConfigurations(B3Colourings, [{min(B["edges"][0]), 3*BInternalVertices + 4},
-                                                           {min(B["edges"][0]) + BInternalVertices, 3*BInternalVertices + 5},
-                                                           {min(B["edges"][0]) + 2*BInternalVertices, 3*BInternalVertices + 6},
-                                                           {min(B["edges"][-4]), 3*BInternalVertices},
-                                                           {min(B["edges"][-3]), 3*BInternalVertices + 1},
-                                                           {min(B["edges"][-2]) + 2*BInternalVertices, 3*BInternalVertices + 2},
-                                                           {min(B["edges"][-1]) + 2*BInternalVertices, 3*BInternalVertices + 3}])
-
-    B3Colourings, B3Configurations = cullColourings(B3Colourings, B3Configurations)
-    print("after culling: " + str(len(B3Colourings)))
-
-    configurations = B2Configurations + B3Configurations
-
-#   we create the directed graph of all B2- and B3-colourings
-    print("creating colouring graph...")
-    colouringsGraph = createColouringsGraph(configurations, True)
-
-#   we then reduce the collection until it obeys conditions (5) and (6) from the thesis
-    print("\ncreating set of colourings...")
-    triangleGraph = createTriangleGraph(colouringsGraph)
-    triangleAdjacency = createAdjacency(triangleGraph)
-
-#   we remove all colourings that are not adjacent to anything
-    for v in triangleGraph["vertices"]:
-        if v != -1:
-            if triangleAdjacency[v] == []:
-                triangleGraph["vertices"][v] = -1
+    if witnesses is not None:
+        witnesses.extend(triangles)
+    return True
 
-#   we count the number of colourings, and we check if there are colourings that attach to themselves such that the collection obeys condition (3) and (4) from the thesis
+# Input: optionally a function which is called as progress(stage, done, total) while a long stage is running, with done out of total items done
+# Output: a dictionary in which the functions of the analysis record their measurements. "stages" contains for each stage that ran the amount
+#         of calls, the wall time and the CPU time of this process in seconds, and the counts recorded by the stage, summed over all calls
+def createMetrics(progress = None):
+    return {"stages": {}, "progress": progress}
+
+# Input: the metrics made by createMetrics or None, and the name of a stage
+# Output: what finishStage needs to record the stage, or None if there are no metrics
+def startStage(metrics, name):
+    if metrics is None:
+        return None
+
+    return [name, time.perf_counter(), time.process_time()]
+
+# Input: the metrics made by createMetrics or None, the result of startStage, and a dictionary of counts of the stage
+# Output: none, the call is recorded in the metrics. counts which are numbers are added to the counts of earlier calls, lists are appended
+def finishStage(metrics, started, counts):
+    if metrics is None:
+        return
+
+    name, wallTime, cpuTime = started
+    stage = metrics["stages"].setdefault(name, {"calls": 0, "wallTime": 0.0, "cpuTime": 0.0})
+    stage["calls"] += 1
+    stage["wallTime"] += time.perf_counter() - wallTime
+    stage["cpuTime"] += time.process_time() - cpuTime
+    for key in counts:
+        if isinstance(counts[key], list):
+            stage.setdefault(key, []).extend(counts[key])
+        else:
+            stage[key] = stage.get(key, 0) + counts[key]
+
+# Input: the metrics made by createMetrics or None, the name of the running stage, and the amount of items done out of the total amount
+# Output: none, the progress function of the metrics is called if there is one
+def reportProgress(metrics, stage, done, total):
+    if metrics is not None and metrics["progress"] is not None:
+        metrics["progress"](stage, done, total)
+
+# Input: the name of a stage, and the amount of items done out of the total amount
+# Output: none, the percentage done is printed over the previous percentage, a stage that is done ends its line
+def printProgress(stage, done, total):
+    print("\r" + stage + ": " + str(round(done / total * 100)) + "%", end="" if done < total else "\n", flush=True)
+
+# Input: a block B, the amount of processes to use, whether to print the progress, optionally a directory to cache the results of each stage in,
+#        optionally a directory in which to store the graph of all colourings and the final subgraph, which are then mapped from these files,
+#        optionally the metrics made by createMetrics in which to record the measurements of each stage, and whether to only decide
+#        if the final set has all kinds of self-attaching colourings and edges. without metrics but with printing the progress,
+#        metrics with printProgress are used. with a cache, the reduction of the set is checkpointed in the cache every checkpointInterval
+#        seconds as in createTriangleGraph, and with resume it continues from the last checkpoint of an interrupted run.
+#        optionally a file to which a certificate of the final set is written by writeCertificate, if the reduction did not stop early
+# Output: a dictionary with the results of the analysis of B: the amount of colourings in the final set, the amount of B^2- and
+#         B^3-colourings in it, the spoke configurations for which no self-attaching colouring exists, and the pairs of spoke
+#         configurations for which no two colourings attach with those colours on their spokes
+#         the results of a stage are only computed if they are not in the cache, and a stage is skipped when the stages using it are in the cache
+#         when deciding, the dictionary also has "verdict", which is True if both lists are empty, and "missingClass", a missing kind or None.
+#         the reduction of the set stops as soon as a kind is missing, and then the dictionary only has these two keys
+def analyseBlock(B, workers = 1, verbose = False, cacheDirectory = None, graphDirectory = None, metrics = None, decide = False,
+                 checkpointInterval = 600, resume = False, certificateFile = None):
+    analysis = createAnalysis(B, workers, verbose, cacheDirectory, graphDirectory, metrics, decide, checkpointInterval, resume)
+    return completeAnalysis(analysis, certificateFile)
+
+# Input: an analysis made by createAnalysis and optionally a file for a certificate as in analyseBlock
+# Output: the results of analyseBlock for the block of the analysis, after which closeAnalysis is called, also when a stage fails
+#         or the run is interrupted, so the files of its graphs are never left behind
+def completeAnalysis(analysis, certificateFile = None):
+    started = startStage(analysis["metrics"], "analyseBlock")
+    try:
+        results = analysisStage(analysis, "results")
+        if certificateFile is not None and "colouringsInCollection" in results:
+            writeCertificate(analysis, certificateFile)
+    finally:
+        closeAnalysis(analysis)
+
+    if "colouringsInCollection" in results:
+        finishStage(analysis["metrics"], started, {"colouringsInCollection": results["colouringsInCollection"]})
+    else:
+        finishStage(analysis["metrics"], started, {})
+    return results
+
+# Input: a graph G, a path of 3 vertices in G as for createBlock, and the options of analyseBlock, where the metrics are optionally
+#        a list with the metrics made by createMetrics for the uncrossed and for the crossed block
+# Output: the results of analyseBlock for the uncrossed and for the crossed block made from G and path, in this order
+#         the two blocks only differ in which right semiedge is which, so the colourings of B are only searched for the uncrossed block,
+#         and those of the crossed block are made from them by createPairedB12Colourings. the later stages are computed for each block
+def analyseBlockPair(G, path, workers = 1, verbose = False, cacheDirectory = None, graphDirectory = None, metrics = None, decide = False,
+                     checkpointInterval = 600, resume = False):
+    if metrics is None:
+        metrics = [None, None]
+    uncrossed = createAnalysis(createBlock(G, path, False), workers, verbose, cacheDirectory, graphDirectory, metrics[0], decide,
+                               checkpointInterval, resume)
+    crossed = createAnalysis(createBlock(G, path, True), workers, verbose, cacheDirectory, graphDirectory, metrics[1], decide,
+                             checkpointInterval, resume)
+    pairAnalyses(uncrossed, crossed)
+
+    results = [completeAnalysis(uncrossed)]
+#   of the uncrossed block only the colourings the crossed block gets its colourings from are still needed
+    uncrossed["stages"] = {stage: uncrossed["stages"][stage] for stage in uncrossed["stages"] if stage == "B12Colourings"}
+    results.append(completeAnalysis(crossed))
+    return results
+
+# Input: the analyses made by createAnalysis of two blocks which only differ in which right semiedge is which, like the crossed and
+#        uncrossed block made from the same graph and path
+# Output: none, the analyses are paired such that the colourings of B are only searched for the first of them that needs them,
+#         and the other one makes its colourings from them by createPairedB12Colourings
+def pairAnalyses(analysis, otherAnalysis):
+    B = analysis["block"]
+    otherB = otherAnalysis["block"]
+    right0, right1 = B["rightSemiedges"]
+    if (B["edges"][:right0] != otherB["edges"][:right0] or min(B["edges"][right0]) != min(otherB["edges"][right1])
+            or min(B["edges"][right1]) != min(otherB["edges"][right0]) or max(B["edges"][right0]) != max(otherB["edges"][right0])
+            or max(B["edges"][right1]) != max(otherB["edges"][right1])):
+        raise ValueError("the blocks do not only differ in which right semiedge is which")
+
+    analysis["pair"] = otherAnalysis
+    otherAnalysis["pair"] = analysis
+
+# Input: a block B and the options of analyseBlock
+# Output: the analysis of B, a dictionary from which analysisStage gets the results of each stage. a stage is only computed when it is
+#         first asked for, together with the stages it needs, and its results are kept in the analysis. everything a stage needs is
+#         kept in its analysis, so several blocks can be analysed in the same process, one analysis for each block
+def createAnalysis(B, workers = 1, verbose = False, cacheDirectory = None, graphDirectory = None, metrics = None, decide = False,
+                   checkpointInterval = 600, resume = False):
+    if verbose and metrics is None:
+        metrics = createMetrics(printProgress)
+
+    return {"block": B, "B2": createCombinedBlock(B, 2), "B3": createCombinedBlock(B, 3), "workers": workers, "verbose": verbose,
+            "cache": openCache(B, cacheDirectory), "graphDirectory": graphDirectory, "graphFiles": None, "metrics": metrics,
+            "decide": decide, "checkpointInterval": checkpointInterval, "resume": resume, "pair": None, "stages": {}}
+
+# Input: an analysis made by createAnalysis and the name of one of its stages in analysisStages
+# Output: the results of the stage, which are computed the first time they are asked for
+def analysisStage(analysis, stage):
+    if stage not in analysis["stages"]:
+        analysis["stages"][stage] = analysisStages[stage](analysis)
+
+    return analysis["stages"][stage]
+
+# Input: an analysis made by createAnalysis, the name of a graph and optionally the extension of its file
+# Output: the name of the file in which to store the graph, or None if the analysis keeps its graphs in memory.
+#         the files are put in a new directory which is removed by closeAnalysis
+def analysisGraphFile(analysis, name, extension = ".csr"):
+    if analysis["graphDirectory"] is None:
+        return None
+
+    if analysis["graphFiles"] is None:
+        analysis["graphFiles"] = tempfile.mkdtemp(dir=analysis["graphDirectory"])
+    return os.path.join(analysis["graphFiles"], name + extension)
+
+# Input: an analysis made by createAnalysis
+# Output: none, the files of its graphs are removed together with the stages using them, other stages are still kept
+def closeAnalysis(analysis):
+    if analysis["graphFiles"] is not None:
+        analysis["stages"].pop("colouringsGraph", None)
+        analysis["stages"].pop("triangleGraph", None)
+        shutil.rmtree(analysis["graphFiles"], ignore_errors=True)
+        analysis["graphFiles"] = None
+
+# Input: an analysis made by createAnalysis
+# Output: the colourings of B made by createB12Colourings. if the analysis is paired with another analysis by pairAnalyses which already
+#         has these colourings, they are made from those by createPairedB12Colourings instead of searched
+def analyseB12Colourings(analysis):
+    pair = analysis["pair"]
+    if pair is not None and "B12Colourings" in pair["stages"]:
+        return createPairedB12Colourings(pair["stages"]["B12Colourings"], analysis["block"], analysis["metrics"])
+
+    return createB12Colourings(analysis["block"], analysis["metrics"])
+
+# Input: an analysis made by createAnalysis
+# Output: the colourings of B as made by createBColourings under "colourings" and their configurations under "configurations", each as a list
+#         with all of them and a list with those with spoke coloured 0
+def analyseBColourings(analysis):
+    B = analysis["block"]
+    verbose = analysis["verbose"]
+    BStage = loadStage(analysis["cache"], "BColourings", B["edges"])
+    if BStage is None:
+#       first we create all colourings of a single block, keeping one colouring of each configuration
+        if verbose: print("creating B colourings...")
+        BColourings, BConfigurations, BAmount = createBColourings(B, analysis["metrics"], B12Colourings=analysisStage(analysis, "B12Colourings"))
+        if verbose: print("B colourings: " + str(BAmount))
+        if verbose: print("after culling: " + str(len(BColourings)))
+
+#       the colourings with spoke coloured 0 come first
+        B0Amount = 0
+        while B0Amount < len(BConfigurations) and BConfigurations[B0Amount][0][0] == 0:
+            B0Amount += 1
+        BStage = {"colourings": [BColourings, BColourings[:B0Amount]], "configurations": [BConfigurations, BConfigurations[:B0Amount]]}
+        saveStage(analysis["cache"], "BColourings", BStage)
+
+    return BStage
+
+# Input: an analysis made by createAnalysis
+# Output: the configurations of the B^2-colourings as made by createB2Colourings under "configurations", as a list with one list, and
+#         the combinations of colourings of B they are made from under "combinations". the colourings themselves are only made to store
+#         them in the cache, where they are under "colourings" instead of the combinations, the rest of the analysis only needs their configurations
+def analyseB2Colourings(analysis):
+    B2 = analysis["B2"]
+    B2Stage = loadStage(analysis["cache"], "B2Colourings", B2["edges"])
+    if B2Stage is None:
+#       we then create all B2-colourings, keeping one colouring of each configuration
+        BStage = analysisStage(analysis, "BColourings")
+        B0Colourings = BStage["colourings"][1]
+        B0Configurations = BStage["configurations"][1]
+        B0ColouringsGraph = createColouringsGraph(B0Configurations, analysis["metrics"])
+        B2Colourings, B2Configurations, B2Amount = createB2Colourings(B2, B0ColouringsGraph, B0Configurations, analysis["metrics"])
+        if analysis["verbose"]: print("B2 colourings: " + str(B2Amount))
+        if analysis["verbose"]: print("after culling: " + str(len(B2Colourings)))
+        B2Stage = {"configurations": [B2Configurations], "combinations": B2Colourings}
+        if analysis["cache"] is not None:
+            saveStage(analysis["cache"], "B2Colourings", {"colourings": [expandCombinedColourings(B2, B2Colourings, B0Colourings)],
+                                                          "configurations": [B2Configurations]})
+
+    return B2Stage
+
+# Input: an analysis made by createAnalysis
+# Output: the configurations of the B^3-colourings as made by createB3Colourings under "configurations", as a list with one list, and
+#         the combinations under "combinations" as for analyseB2Colourings. the colourings themselves are only made to store them in the cache
+def analyseB3Colourings(analysis):
+    B3 = analysis["B3"]
+    B3Stage = loadStage(analysis["cache"], "B3Colourings", B3["edges"])
+    if B3Stage is None:
+#       we do the same for the B3-configurations
+        BStage = analysisStage(analysis, "BColourings")
+        BColourings = BStage["colourings"][0]
+        BConfigurations = BStage["configurations"][0]
+        BColouringsGraph = createColouringsGraph(BConfigurations, analysis["metrics"])
+        B3Colourings, B3Configurations, B3Amount = createB3Colourings(B3, BColouringsGraph, BConfigurations, analysis["metrics"])
+        if analysis["verbose"]: print("B3 colourings: " + str(B3Amount))
+        if analysis["verbose"]: print("after culling: " + str(len(B3Colourings)))
+        B3Stage = {"configurations": [B3Configurations], "combinations": B3Colourings}
+        if analysis["cache"] is not None:
+            saveStage(analysis["cache"], "B3Colourings", {"colourings": [expandCombinedColourings(B3, B3Colourings, BColourings)],
+                                                          "configurations": [B3Configurations]})
+
+    return B3Stage
+
+# Input: an analysis made by createAnalysis
+# Output: the list of configurations of all B^2-colourings followed by those of all B^3-colourings, which are the vertices of the graphs
+def analyseConfigurations(analysis):
+    return analysisStage(analysis, "B2Colourings")["configurations"][0] + analysisStage(analysis, "B3Colourings")["configurations"][0]
+
+# Input: an analysis made by createAnalysis
+# Output: the directed graph of all B^2- and B^3-colourings as made by createColouringsGraph
+def analyseColouringsGraph(analysis):
+    colouringsGraph = loadStage(analysis["cache"], "colouringsGraph")
+    if colouringsGraph is None:
+#       we create the directed graph of all B2- and B3-colourings
+        configurations = analysisStage(analysis, "configurations")
+        if analysis["verbose"]: print("creating colouring graph...")
+        colouringsGraph = createColouringsGraph(configurations, analysis["metrics"], analysis["workers"], analysisGraphFile(analysis, "colouringsGraph"))
+        saveStage(analysis["cache"], "colouringsGraph", colouringsGraph)
+
+    return colouringsGraph
+
+# Input: an analysis made by createAnalysis
+# Output: the final set as the subgraph of the colourings graph made by createTriangleGraph. when deciding and a kind is missing,
+#         the graph is not finished and is not stored in the cache
+def analyseTriangleGraph(analysis):
+    triangleGraph = loadStage(analysis["cache"], "triangleGraph")
+    if triangleGraph is None:
+        colouringsGraph = analysisStage(analysis, "colouringsGraph")
+        configurations = analysisStage(analysis, "configurations")
+
+#       we then reduce the collection until it obeys conditions (5) and (6) from the thesis
+        if analysis["verbose"]: print("creating set of colourings...")
+        checkpointFile = None
+        if analysis["cache"] is not None:
+            checkpointFile = os.path.join(analysis["cache"], "triangleGraph.checkpoint")
+        triangleGraph = createTriangleGraph(colouringsGraph, configurations, analysis["workers"], analysis["metrics"],
+                                            analysisGraphFile(analysis, "triangleGraph"), analysis["decide"], checkpointFile,
+                                            analysis["checkpointInterval"], analysis["resume"],
+                                            [analysisGraphFile(analysis, "triangleIndexOut"), analysisGraphFile(analysis, "triangleIndexIn")],
+                                            [analysisGraphFile(analysis, "witnessOffsets", ".array"), analysisGraphFile(analysis, "witnessSlots", ".array")])
+        if triangleGraph.get("missingClass") is None:
+            saveStage(analysis["cache"], "triangleGraph", triangleGraph)
+
+    return triangleGraph
+
+# Input: an analysis made by createAnalysis
+# Output: the results of analyseBlock
+def analyseResults(analysis):
+    triangleGraph = analysisStage(analysis, "triangleGraph")
+    if triangleGraph.get("missingClass") is not None:
+        return {"verdict": False, "missingClass": triangleGraph["missingClass"]}
+    configurations = analysisStage(analysis, "configurations")
+
+#   we leave out all colourings that are not adjacent to anything, we count the number of colourings, and we check if there are colourings
+#   that attach to themselves such that the collection obeys condition (3) and (4) from the thesis
     vertexAmount = 0
     P2Amount = 0
     P3Amount = 0
-    selfAdjacentB2Colourings = {"00": False, "11": False, "22": False}
-    selfAdjacentB3Colourings = {"012": False, "021": False, "102": False, "120": False, "201": False, "210": False}
+    selfAdjacentColourings = {c: False for c in selfAdjacentClasses}
     for v in triangleGraph["vertices"]:
-        if v != -1:
+        if v != -1 and triangleGraph["offsets"][v] != triangleGraph["offsets"][v+1]:
             vertexAmount += 1
             if len(configurations[v]) == 6: P2Amount += 1
             else: P3Amount += 1
 
-            if v in triangleAdjacency[v]:
-                if len(configurations[v]) == 6:
-                    selfAdjacentB2Colourings[str(configurations[v][0][0]) + str(configurations[v][1][0])] = True
-                else:
-                    selfAdjacentB3Colourings[str(configurations[v][0][0]) + str(configurations[v][1][0]) + str(configurations[v][2][0])] = True
+            if hasEdge(triangleGraph, v, v):
+                selfAdjacentColourings[spokeType(configurations[v])] = True
     selfAdjacentNotPresent = []
-    for i in selfAdjacentB2Colourings:
-        if not selfAdjacentB2Colourings[i]: selfAdjacentNotPresent.append(i)
-    for i in selfAdjacentB3Colourings:
-        if not selfAdjacentB3Colourings[i]: selfAdjacentNotPresent.append(i)
+    for i in selfAdjacentColourings:
+        if not selfAdjacentColourings[i]: selfAdjacentNotPresent.append(i)
 
 #   we check which kind of connections are still present in the final collection. This tells us if we need to exlude triples with middle spoke coloured 1 or 2.
 #   If for example there exist no connections including a triple with spokes coloured 213 or 312, it means these colouring were weeded out and we need to exclude triples with middle spoke coloured 1
-    B2B2Edges = {"00-00": False, "00-11": False, "00-22": False, "11-11": False, "11-22": False, "22-22": False}
-    B2B3Edges = {"00-012": False, "00-021": False, "00-102": False, "00-120": False, "00-201": False, "00-210": False,
-                 "11-012": False, "11-021": False, "11-102": False, "11-120": False, "11-201": False, "11-210": False,
-                 "22-012": False, "22-021": False, "22-102": False, "22-120": False, "22-201": False, "22-210": False,}
-    B3B3Edges = {"012-012": False, "012-021": False, "012-102": False, "012-120": False, "012-201": False, "012-210": False,
-                 "021-021": False, "021-102": False, "021-120": False, "021-201": False, "021-210": False,
-                 "102-102": False, "102-120": False, "102-201": False, "102-210": False,
-                 "120-120": False, "120-201": False, "120-210": False, "201-201": False, "201-210": False, "210-210": False,}
-    for e in triangleGraph["edges"]:
-        if len(configurations[e[0]]) == 6:
-            if len(configurations[e[1]]) == 6:
-                B2B2Edges[str(configurations[e[0]][0][0]) + str(configurations[e[0]][1][0]) + "-" + str(configurations[e[1]][0][0]) + str(configurations[e[1]][1][0])] = True
+    edges = {c: False for c in edgeClasses}
+    for v in range(len(triangleGraph["vertices"])):
+        for w in graphRow(triangleGraph, v):
+            edgeClass = spokeType(configurations[v]) + "-" + spokeType(configurations[w])
+            if edgeClass in edges:
+                edges[edgeClass] = True
+    edgesNotPresent = []
+    for i in edges:
+        if not edges[i]: edgesNotPresent.append(i)
+
+    results = {"colouringsInCollection": vertexAmount, "B2Colourings": P2Amount, "B3Colourings": P3Amount,
+               "selfAdjacentNotPresent": selfAdjacentNotPresent, "edgesNotPresent": edgesNotPresent}
+    if analysis["decide"]:
+        results["verdict"] = selfAdjacentNotPresent == [] and edgesNotPresent == []
+        results["missingClass"] = (selfAdjacentNotPresent + edgesNotPresent + [None])[0]
+    return results
+
+# Input: an analysis made by createAnalysis
+# Output: all colourings of B as made by createAllBColourings under "colourings" and their configurations under "configurations", each as a list
+#         with one list, and the directed graph of these colourings made by createColouringsGraph under "colouringsGraph"
+def analyseAllBColourings(analysis):
+    B = analysis["block"]
+    allBStage = loadStage(analysis["cache"], "allBColourings", B["edges"])
+    if allBStage is None:
+        if analysis["verbose"]: print("creating all B colourings...")
+        allBColourings, allBConfigurations, allBAmount = createAllBColourings(B, analysis["metrics"],
+                                                                             B12Colourings=analysisStage(analysis, "B12Colourings"))
+        if analysis["verbose"]: print("all B colourings: " + str(allBAmount))
+        if analysis["verbose"]: print("after culling: " + str(len(allBColourings)))
+        allBStage = {"colourings": [allBColourings], "configurations": [allBConfigurations]}
+        saveStage(analysis["cache"], "allBColourings", allBStage)
+
+    allBStage["colouringsGraph"] = createColouringsGraph(allBStage["configurations"][0], analysis["metrics"], analysis["workers"])
+    return allBStage
+
+# Input: an analysis made by createAnalysis and an odd amount of blocks k of at least 3
+# Output: a dictionary with "snarkBlocks", which is k, and "colourable", whether the snark made by createLoupekineSnark from k copies of B
+#         has a normal 5-edge-colouring. if it has, "colouring" contains the colour of each edge of the snark in the order of its edges
+def analyseSnark(analysis, k):
+    allBStage = analysisStage(analysis, "allBColourings")
+    if analysis["verbose"]: print("colouring the snark with " + str(k) + " blocks...")
+    blockColourings = createSnarkColouring(allBStage["configurations"][0], allBStage["colouringsGraph"], k, analysis["metrics"])
+    if blockColourings is None:
+        return {"snarkBlocks": k, "colourable": False}
+
+    snark = createLoupekineSnark(analysis["block"], k)
+    colouring = combineBColourings(snark, [allBStage["colourings"][0][v] for v in blockColourings])
+    return {"snarkBlocks": k, "colourable": True, "colouring": [e[1] for e in colouring]}
+
+# Input: an analysis made by createAnalysis, "B2Colourings" or "B3Colourings", and a list of positions of colourings of that stage
+# Output: the colourings of B^2 or B^3 at these positions, expanded from the combinations of the stage by expandCombinedColourings,
+#         or taken from the stage if it was loaded from the cache
+def analysisColourings(analysis, stage, positions):
+    colouringsStage = analysisStage(analysis, stage)
+    if "colourings" in colouringsStage:
+        return [colouringsStage["colourings"][0][p] for p in positions]
+
+    BStage = analysisStage(analysis, "BColourings")
+    if stage == "B2Colourings":
+        return expandCombinedColourings(analysis["B2"], [colouringsStage["combinations"][p] for p in positions], BStage["colourings"][1])
+    return expandCombinedColourings(analysis["B3"], [colouringsStage["combinations"][p] for p in positions], BStage["colourings"][0])
+
+# Input: an analysis made by createAnalysis and the name of a file
+# Output: none, a certificate of the final set is written to the file, which verifyCertificate.py checks without repeating the search.
+#         it is JSON compressed with gzip, with the edges of B under "block", the results of analyseBlock under "results", the colourings
+#         of the final set under "colourings", each as a string with the colour of every edge of B^2 or B^3 in the order of createCombinedBlock,
+#         and the edges between them as a graph in compressed sparse row form under "offsets" and "targets". for each edge "witnesses"
+#         contains, in the order of triangleClasses, the colourings found by hasTriangles that complete its triangles for conditions (5) and (6)
+#         the final set consists of the colourings with an edge from or to a colouring, which are numbered again in increasing order.
+#         the certificate is written by replaceFile, so jobs writing to the same file never leave a partial certificate, and it can be
+#         read by others as allowed by the umask, so it can be checked by another user or copied to another machine
+def writeCertificate(analysis, fileName):
+    triangleGraph = analysisStage(analysis, "triangleGraph")
+    if triangleGraph.get("missingClass") is not None:
+        raise ValueError("the reduction stopped at a missing " + triangleGraph["missingClass"] + ", so there is no final set to certify")
+    configurations = analysisStage(analysis, "configurations")
+    B2Amount = len(analysisStage(analysis, "B2Colourings")["configurations"][0])
+    B = analysis["block"]
+
+    kept = bytearray(len(configurations))
+    for v in range(len(configurations)):
+        for w in graphRow(triangleGraph, v):
+            kept[v] = 1
+            kept[w] = 1
+    vertices = [v for v in range(len(configurations)) if kept[v]]
+    newVertices = {vertices[i]: i for i in range(len(vertices))}
+
+    offsets = array("q", [0])
+    targets = array("i")
+    for v in vertices:
+        for w in graphRow(triangleGraph, v):
+            targets.append(newVertices[w])
+        offsets.append(len(targets))
+    G = {"vertices": range(len(vertices)), "offsets": offsets, "targets": targets}
+
+    triangleIndex = createTriangleIndex(G, [configurations[v] for v in vertices])
+    removed = bytearray(len(vertices))
+    witnesses = []
+    for v in G["vertices"]:
+        for w in graphRow(G, v):
+            if not hasTriangles(triangleIndex, removed, [v, w], witnesses):
+                raise ValueError("the edge from colouring " + str(vertices[v]) + " to " + str(vertices[w]) + " does not obey conditions (5) and (6)")
+
+    colourings = (analysisColourings(analysis, "B2Colourings", [v for v in vertices if v < B2Amount])
+                  + analysisColourings(analysis, "B3Colourings", [v - B2Amount for v in vertices if v >= B2Amount]))
+    certificate = {"block": {"vertices": len(B["vertices"]), "edges": [sorted(e) for e in B["edges"]]},
+                   "results": analysisStage(analysis, "results"),
+                   "colourings": ["".join(str(e[1]) for e in expandColouring(colouring)) for colouring in colourings],
+                   "offsets": offsets.tolist(), "targets": targets.tolist(), "witnesses": witnesses}
+    replaceFile(fileName, gzip.compress(json.dumps(certificate, separators=(",", ":")).encode()))
+
+# the stages of an analysis by name, with the function computing each stage from the stages it asks for with analysisStage
+analysisStages = {"B12Colourings": analyseB12Colourings, "BColourings": analyseBColourings, "B2Colourings": analyseB2Colourings, "B3Colourings": analyseB3Colourings,
+                  "configurations": analyseConfigurations, "colouringsGraph": analyseColouringsGraph,
+                  "triangleGraph": analyseTriangleGraph, "results": analyseResults, "allBColourings": analyseAllBColourings}
+
+# Input: a block B and a directory, or None
+# Output: the cache of B in the directory, or None if no directory is given. the results of B are stored in a subdirectory named by a
+#         hash of the edges of B and of this source file, so changing the code never loads results made by an older version
+def openCache(B, cacheDirectory):
+    if cacheDirectory is None:
+        return None
+
+    fingerprint = hashlib.sha256()
+    with open(__file__, "rb") as sourceFile:
+        fingerprint.update(sourceFile.read())
+    for e in B["edges"]:
+        fingerprint.update(repr(sorted(e)).encode())
+
+    directory = os.path.join(cacheDirectory, fingerprint.hexdigest())
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+# Input: a cache made by openCache, the name of a stage and the results of the stage. these are either a directed graph, or a dictionary with a list of
+#        lists of colourings under "colourings" and a list of lists of configurations under "configurations"
+# Output: none, a graph is written to the cache by replaceGraphFile, with its vertices written after it by replaceFile as the bytes of
+#         an array of type "i", and colourings are written by writeCompressedFile
+def saveStage(cache, stage, results):
+    if cache is None:
+        return
+
+    if "targets" in results:
+        replaceGraphFile(os.path.join(cache, stage + ".csr"), results)
+        replaceFile(os.path.join(cache, stage + ".vertices"), array("i", results["vertices"]).tobytes())
+        return
+
+    data = encodeColourings(results["colourings"])
+    data["configurations"] = results["configurations"]
+    writeCompressedFile(os.path.join(cache, stage + ".bin"), data)
+
+# Input: a cache made by openCache, the name of a stage, and for stages with colourings the list of edges of the coloured graph
+# Output: the results of the stage as given to saveStage, or None if they are not in the cache. a graph is mapped from the cache
+#         by openGraphFile, so it is read from disk as needed like a graph in the graph directory
+def loadStage(cache, stage, edges = None):
+    if cache is None:
+        return None
+
+    if edges is None:
+        verticesName = os.path.join(cache, stage + ".vertices")
+        if not os.path.exists(verticesName):
+            return None
+        vertices = array("i")
+        with open(verticesName, "rb") as verticesFile:
+            vertices.frombytes(verticesFile.read())
+        G = openGraphFile(os.path.join(cache, stage + ".csr"))
+        G["vertices"] = vertices.tolist()
+        return G
+
+    data = readCompressedFile(os.path.join(cache, stage + ".bin"))
+    if data is None:
+        return None
+
+    return {"colourings": decodeColourings(data, edges), "configurations": data["configurations"]}
+
+# Input: the name of a file and data that can be pickled
+# Output: none, the data is written to the file in a compressed binary form by replaceFile
+def writeCompressedFile(fileName, data):
+    replaceFile(fileName, zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+
+# Input: the name of a file and the bytes to put in it
+# Output: none, the bytes are written to a new file with a unique name in the same directory, which then replaces the file.
+#         an interrupted run never leaves a partial file behind, and processes sharing a directory, like jobs sharing a cache,
+#         each write their own file, so one never replaces the file with the partial file of another. the new file gets the
+#         permissions of a file made by open, since mkstemp makes files only the owner can read
+def replaceFile(fileName, contents):
+    temporaryFile, temporaryName = startReplacingFile(fileName)
+    try:
+        with temporaryFile:
+            temporaryFile.write(contents)
+        finishReplacingFile(fileName, temporaryName)
+    except BaseException:
+        if os.path.exists(temporaryName):
+            os.remove(temporaryName)
+        raise
+
+# Input: the name of a file and a directed graph
+# Output: none, the graph is written in the form read by openGraphFile as by replaceFile. the targets are written straight from the
+#         graph, so a graph mapped from a file is copied from it without being loaded
+def replaceGraphFile(fileName, G):
+    graphFile, temporaryName = startReplacingFile(fileName)
+    try:
+        with graphFile:
+#           the header is filled in by finishGraphFile
+            graphFile.write(bytes(16))
+            graphFile.write(G["targets"])
+            finishGraphFile(graphFile, G["offsets"])
+        finishReplacingFile(fileName, temporaryName)
+    except BaseException:
+        if os.path.exists(temporaryName):
+            os.remove(temporaryName)
+        raise
+
+# Input: the name of a file
+# Output: a new file with a unique name in the same directory as this file, opened for writing, and its name
+def startReplacingFile(fileName):
+    descriptor, temporaryName = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fileName)), prefix=os.path.basename(fileName) + ".",
+                                                 suffix=".tmp")
+    return os.fdopen(descriptor, "wb"), temporaryName
+
+# Input: the name of a file and the name of a file made by startReplacingFile, which is written and closed
+# Output: none, the new file gets the permissions allowed by the umask and replaces the file
+def finishReplacingFile(fileName, temporaryName):
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(temporaryName, 0o666 & ~umask)
+    os.replace(temporaryName, fileName)
+
+# Input: the name of a file written by writeCompressedFile
+# Output: the data in the file, or None if there is no such file
+def readCompressedFile(fileName):
+    if not os.path.exists(fileName):
+        return None
+    with open(fileName, "rb") as dataFile:
+        return pickle.loads(zlib.decompress(dataFile.read()))
+
+# Input: a list of lists of colourings of the same graph
+# Output: a dictionary with "representatives", the colours of all shared colouring lists one after the other, and "lists",
+#         which contains for each list of colourings the indices of their shared lists and their permutations, all as bytes
+def encodeColourings(colouringLists):
+    representatives = {}
+    representativeColours = bytearray()
+    lists = []
+    for colourings in colouringLists:
+        indices = array("i")
+        permutations = bytearray()
+        for colouring, permutation in colourings:
+            if id(colouring) not in representatives:
+                representatives[id(colouring)] = len(representatives)
+                for e in colouring:
+                    representativeColours.append(e[1])
+            indices.append(representatives[id(colouring)])
+            permutations.extend(permutation)
+        lists.append([indices.tobytes(), bytes(permutations)])
+
+    return {"representatives": bytes(representativeColours), "lists": lists}
+
+# Input: a dictionary made by encodeColourings and the list of edges of the coloured graph
+# Output: the list of lists of colourings which was encoded, where colourings that shared a list share it again
+def decodeColourings(data, edges):
+    colours = data["representatives"]
+    representatives = []
+    for start in range(0, len(colours), len(edges)):
+        colouring = []
+        for i in range(len(edges)):
+            colouring.append([edges[i], colours[start + i]])
+        representatives.append(colouring)
+
+    colouringLists = []
+    for encodedIndices, permutations in data["lists"]:
+        indices = array("i")
+        indices.frombytes(encodedIndices)
+        colourings = []
+        for i in range(len(indices)):
+            colourings.append([representatives[indices[i]], tuple(permutations[5*i:5*i + 5])])
+        colouringLists.append(colourings)
+
+    return colouringLists
+
+# Input: a job, which is a dictionary with "graph", the name of a predefined graph or a graph with "vertices" the amount of vertices
+#        and "edges" a list of pairs of vertices, "path", the path of three vertices to remove, and optionally "crossed"
+# Output: the block of the job
+def createJobBlock(job):
+    return createBlock(jobGraph(job), job["path"], job.get("crossed", False))
+
+# Input: a job as for createJobBlock
+# Output: the graph of the job
+def jobGraph(job):
+    G = job["graph"]
+    if isinstance(G, str):
+        return predefinedGraphs[G]
+
+    return {"vertices": range(G["vertices"]), "edges": [set(e) for e in G["edges"]]}
+
+# Input: a job as for createJobBlock, where "path" can also be "all"
+# Output: the list of jobs to run. if the path is "all" this contains a job for one block of each isomorphism class of blocks of the graph,
+#         with "isomorphicBlocks" the list of pairs [path, crossed] of all blocks in the class
+def expandJob(job):
+    if job["path"] != "all":
+        return [job]
+
+    jobs = []
+    for blockClass in createBlockClasses(jobGraph(job)):
+        path, crossed = blockClass["blocks"][0]
+        classJob = dict(job)
+        classJob.update({"path": path, "crossed": crossed, "isomorphicBlocks": blockClass["blocks"]})
+        jobs.append(classJob)
+
+    return jobs
+
+# Input: a job as for expandJob, where "crossed" is not used
+# Output: the list of jobs to run with analyseJobPair. if the path is "all" this contains a job for one path of each isomorphism class
+#         of pairs of an uncrossed and a crossed block made from the same path, with "isomorphicPaths" the list of all paths in the class
+def expandPairedJob(job):
+    if job["path"] != "all":
+        return [job]
+
+    G = jobGraph(job)
+    classes = {}
+    for path in admissiblePaths(G):
+        form = (blockCanonicalForm(createBlock(G, path, False)), blockCanonicalForm(createBlock(G, path, True)))
+        classes.setdefault(form, []).append(path)
+
+    jobs = []
+    for paths in classes.values():
+        classJob = dict(job)
+        classJob.update({"path": paths[0], "isomorphicPaths": paths})
+        jobs.append(classJob)
+
+    return jobs
+
+# Input: the name of a file with a job on each line, as a JSON object, and optionally the function expanding the jobs
+# Output: a generator of the jobs of each line as expanded by expandJob or by the given function. the lines are read as the jobs are used
+def readJobsFile(fileName, expand = expandJob):
+    with open(fileName) as jobsFile:
+        for line in jobsFile:
+            if line.strip():
+                yield from expand(json.loads(line))
+
+# Input: the name of a file with a graph on each line in graph6 or sparse6 format
+# Output: a generator of the jobs which analyse one block of each isomorphism class of blocks of each graph, as for expandJob.
+#         each job also has "index", the line of its graph counting from 0. the file is read one graph at a time as the jobs are used
+def readGraph6Jobs(fileName):
+    for index, G in enumerate(readGraph6(fileName)):
+        yield from expandJob({"graph": {"vertices": len(G["vertices"]), "edges": [sorted(e) for e in G["edges"]]}, "index": index, "path": "all"})
+
+# Input: the name of a file with a graph on each line in graph6 or sparse6 format, as written by nauty and House of Graphs
+# Output: a generator of the graphs in the file, each as a dictionary with "vertices" and "edges" like the predefined graphs.
+#         the graphs are read and decoded one at a time when they are needed
+def readGraph6(fileName):
+    with open(fileName, "rb") as graphFile:
+        for line in graphFile:
+            line = line.strip()
+            for header in (b">>graph6<<", b">>sparse6<<"):
+                if line.startswith(header):
+                    line = line[len(header):]
+            if not line:
+                continue
+
+            if line.startswith(b":"):
+                yield decodeSparse6(line[1:])
             else:
-                B2B3Edges[str(configurations[e[0]][0][0]) + str(configurations[e[0]][1][0]) + "-" + str(configurations[e[1]][0][0]) + str(configurations[e[1]][1][0]) + str(configurations[e[1]][2][0])] = True
+                yield decodeGraph6(line)
+
+# Input: the bytes of a graph in graph6 format
+# Output: the graph as a dictionary with "vertices" and "edges"
+def decodeGraph6(data):
+    n, bits = decodeGraph6Data(data)
+    if len(bits) < n*(n-1)//2:
+        raise ValueError("graph6 data is too short for " + str(n) + " vertices")
+
+#   the bits are the upper triangle of the adjacency matrix, column by column
+    edges = []
+    position = 0
+    for j in range(1, n):
+        for i in range(j):
+            if bits[position] == "1":
+                edges.append({i, j})
+            position += 1
+
+    return {"vertices": range(n), "edges": edges}
+
+# Input: the bytes of a graph in sparse6 format, without the first ":"
+# Output: the graph as a dictionary with "vertices" and "edges"
+def decodeSparse6(data):
+    n, bits = decodeGraph6Data(data)
+    k = 1
+    while 1 << k < n:
+        k += 1
+
+#   the bits are pairs of a bit b and a vertex x of k bits. b says whether to go to the next vertex v,
+#   and x is either the other end of an edge of v or, if it is larger than v, the vertex to go to
+    edges = []
+    v = 0
+    position = 0
+    while position + 1 + k <= len(bits):
+        if bits[position] == "1":
+            v += 1
+        x = int(bits[position+1:position+1+k], 2)
+        position += 1 + k
+
+#       the padding at the end can give vertices that are too large
+        if x >= n or v >= n:
+            break
+        elif x > v:
+            v = x
         else:
-            if len(configurations[e[1]]) == 7:
-                B3B3Edges[str(configurations[e[0]][0][0]) + str(configurations[e[0]][1][0]) + str(configurations[e[0]][2][0]) + "-" +
-                          str(configurations[e[1]][0][0]) + str(configurations[e[1]][1][0]) + str(configurations[e[1]][2][0])] = True
-    edgesNotPresent = []
-    for i in B2B2Edges:
-        if not B2B2Edges[i]: edgesNotPresent.append(i)
-    for i in B2B3Edges:
-        if not B2B3Edges[i]: edgesNotPresent.append(i)
-    for i in B3B3Edges:
-        if not B3B3Edges[i]: edgesNotPresent.append(i)
-
-    print("\ncolourings in collection: " + str(vertexAmount))
-    print("B2-Colourings: " + str(P2Amount))
-    print("B3-Colourings: " + str(P3Amount))
-    print("self adjacent not present: " + str(selfAdjacentNotPresent))
-    print("edges not present: " + str(edgesNotPresent))
+            edges.append({x, v})
+
+    return {"vertices": range(n), "edges": edges}
+
+# Input: the bytes of a graph in graph6 or sparse6 format, without the first ":" of sparse6
+# Output: the amount of vertices of the graph and the rest of the data as a string of bits, six for each byte
+def decodeGraph6Data(data):
+    values = []
+    for c in data:
+        if not 63 <= c <= 126:
+            raise ValueError("invalid character in graph6 or sparse6 data: " + repr(chr(c)))
+        values.append(c - 63)
+
+    if values[:1] != [63]:
+        n, start = values[0], 1
+    elif values[1:2] != [63]:
+        n, start = (values[1] << 12) + (values[2] << 6) + values[3], 4
+    else:
+        n, start = 0, 2
+        for value in values[2:8]:
+            n = (n << 6) + value
+        start = 8
+
+    bits = "".join(format(value, "06b") for value in values[start:])
+    return n, bits
+
+# Input: an iterable of jobs
+# Output: a generator of the jobs whose graph and path were not in an earlier job, so a job file listing both the uncrossed and
+#         the crossed block of a path gives one job for analyseJobPair
+def pairJobs(jobs):
+    pairedPaths = set()
+    for job in jobs:
+        key = json.dumps([job["graph"], job["path"]])
+        if key not in pairedPaths:
+            pairedPaths.add(key)
+            yield job
+
+# Input: a pool of processes, an iterable of jobs, the amount of jobs to run at the same time, the function analysing a job, which is
+#        analyseJob or analyseJobPair, and its other arguments
+# Output: a generator of the results of this function for the jobs, in the order of the jobs. a job is only taken from the iterable
+#         when one of the running jobs is done, so the jobs can be read while the first ones are analysed
+def analyseJobs(executor, jobs, window, analyse, *arguments):
+    running = collections.deque()
+    for job in jobs:
+        running.append(executor.submit(analyse, job, *arguments))
+        if len(running) >= window:
+            yield running.popleft().result()
+
+    while running:
+        yield running.popleft().result()
+
+# Input: a job as for createJobBlock, optionally a directory to cache the results in and a directory to store the graphs in,
+#        whether to add the metrics of the analysis, whether to only decide the verdict as in analyseBlock, optionally an amount of blocks k,
+#        the amount of processes to use for the block, and whether to resume and how often to checkpoint as in analyseBlock
+# Output: the job together with the results of analyseBlock for its block, and if asked the stages of its metrics under "metrics"
+#         with an amount of blocks, the results are those of analyseSnark for the Loupekine snark with k copies of the block instead
+def analyseJob(job, cacheDirectory = None, graphDirectory = None, withMetrics = False, decide = False, snark = None, workers = 1,
+               resume = False, checkpointInterval = 600, certificateFile = None):
+    result = dict(job)
+    metrics = createMetrics() if withMetrics else None
+    if snark is not None:
+        result.update(analyseSnark(createAnalysis(createJobBlock(job), workers, cacheDirectory=cacheDirectory, metrics=metrics), snark))
+    else:
+        result.update(analyseBlock(createJobBlock(job), workers, cacheDirectory=cacheDirectory, graphDirectory=graphDirectory, metrics=metrics,
+                                   decide=decide, checkpointInterval=checkpointInterval, resume=resume, certificateFile=certificateFile))
+    if withMetrics:
+        result["metrics"] = metrics["stages"]
+    return result
+
+# Input: a job as for createJobBlock, where "crossed" is not used, and the options of analyseJob without an amount of blocks
+# Output: a list with the results of analyseJob for the uncrossed and for the crossed block of the job, made by analyseBlockPair
+def analyseJobPair(job, cacheDirectory = None, graphDirectory = None, withMetrics = False, decide = False, workers = 1, resume = False,
+                   checkpointInterval = 600):
+    if "isomorphicBlocks" in job:
+        raise ValueError("a job for an isomorphism class of blocks cannot be paired")
+    metrics = [createMetrics(), createMetrics()] if withMetrics else None
+    pairResults = analyseBlockPair(jobGraph(job), job["path"], workers, cacheDirectory=cacheDirectory, graphDirectory=graphDirectory,
+                                   metrics=metrics, decide=decide, checkpointInterval=checkpointInterval, resume=resume)
+    results = []
+    for i in range(2):
+        result = dict(job)
+        result["crossed"] = i == 1
+        result.update(pairResults[i])
+        if withMetrics:
+            result["metrics"] = metrics[i]["stages"]
+        results.append(result)
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the conditions from the thesis for the Loupekine snarks made with a block. "
+                                                 "Without arguments the block entered below is analysed and the results are printed as text, "
+                                                 "otherwise the results for each block are printed as a line of JSON.")
+    parser.add_argument("graph", nargs="?", choices=predefinedGraphs, help="the name of a predefined graph to create the block from")
+    parser.add_argument("path", nargs="*", type=int, help="the three vertices of the path to remove")
+    parser.add_argument("--crossed", action="store_true", help="create a crossed block")
+    parser.add_argument("--all-paths", action="store_true", help="analyse one block of each isomorphism class of blocks of the graph, "
+                                                                 "over all admissible paths and both crossed and uncrossed")
+    parser.add_argument("--jobs", metavar="FILE", help="a file with a job on each line, as a JSON object with keys \"graph\", \"path\" and \"crossed\". "
+                                                       "the path can be \"all\" as with --all-paths")
+    parser.add_argument("--graph6", metavar="FILE", help="a file with a graph on each line in graph6 or sparse6 format, for each of which "
+                                                         "one block of each isomorphism class is analysed as with --all-paths")
+    parser.add_argument("--metrics", action="store_true", help="add the wall and CPU time and the counts of each stage to the results, "
+                                                               "as JSON under \"metrics\"")
+    parser.add_argument("--decide", action="store_true", help="only decide whether the final set has all kinds of self-attaching colourings "
+                                                              "and edges, and stop as soon as one is missing. the results get \"verdict\" "
+                                                              "and \"missingClass\"")
+    parser.add_argument("--snark", metavar="K", type=int, help="instead check whether the Loupekine snark made from K copies of the block, "
+                                                               "with the spokes of the first three copies meeting in a vertex and the other "
+                                                               "spokes joined in pairs, has a normal 5-edge-colouring, and give one if it has")
+    parser.add_argument("--workers", type=int, default=1, help="the amount of processes to use. with several jobs the jobs run in parallel, "
+                                                               "otherwise the colourings graph and the triangle check of the block do")
+    parser.add_argument("--cache", metavar="DIRECTORY", help="a directory to store the results of each stage in, so they are loaded instead of "
+                                                             "computed when the same block is analysed again")
+    parser.add_argument("--graph-directory", metavar="DIRECTORY", help="a directory to store the graph of all colourings and its final subgraph in "
+                                                                       "while a block is analysed, which are then read from disk as needed instead "
+                                                                       "of being kept in memory")
+    parser.add_argument("--checkpoint-interval", metavar="SECONDS", type=float, default=600, help="with --cache, how often to write the state "
+                                                                                                  "of the reduction of the set to the cache")
+    parser.add_argument("--resume", action="store_true", help="with --cache, continue the reduction of the set of an interrupted run from "
+                                                              "its last checkpoint")
+    parser.add_argument("--certificate", metavar="FILE", help="write the final set of a single block with the edges between its colourings "
+                                                              "to FILE, which verifyCertificate.py checks without repeating the search")
+    parser.add_argument("--paired", action="store_true", help="analyse both the uncrossed and the crossed block of each path, searching the "
+                                                              "colourings of the block only once, and print a line of JSON for each")
+    arguments = parser.parse_args()
+    if arguments.certificate is not None and (arguments.snark is not None or arguments.all_paths or arguments.paired):
+        parser.error("--certificate needs a single block and cannot be used with --snark, --all-paths or --paired")
+    if arguments.paired and (arguments.snark is not None or arguments.all_paths or arguments.graph6 is not None or arguments.crossed):
+        parser.error("--paired cannot be used with --snark, --all-paths, --graph6 or --crossed")
+    if arguments.paired and arguments.graph is None and arguments.jobs is None:
+        parser.error("--paired needs a graph and path or --jobs")
+    if (arguments.all_paths or arguments.crossed) and arguments.graph is None:
+        parser.error("--all-paths and --crossed need a graph")
+    if arguments.resume and arguments.cache is None:
+        parser.error("--resume needs --cache")
+    if arguments.snark is not None and (arguments.snark < 3 or arguments.snark % 2 == 0):
+        parser.error("a Loupekine snark needs an odd amount of at least 3 blocks")
+
+    if arguments.graph is None and arguments.jobs is None and arguments.graph6 is None:
+#       enter the block you want to test below by selecting a snark, a path of three vertices to remove, and whether the block crossed
+#       if needed you can add a snark at the top to be able to make blocks from that snark
+        B = createBlock(petersenGraph, [2, 0, 3], False)
+
+        metrics = createMetrics(printProgress)
+        if arguments.snark is not None:
+            results = analyseSnark(createAnalysis(B, arguments.workers, True, arguments.cache, metrics=metrics), arguments.snark)
+            print("\nsnark with " + str(arguments.snark) + " blocks colourable: " + str(results["colourable"]))
+            if results["colourable"]:
+                print("colouring: " + str(results["colouring"]))
+        else:
+            results = analyseBlock(B, arguments.workers, True, arguments.cache, arguments.graph_directory, metrics, arguments.decide,
+                                   arguments.checkpoint_interval, arguments.resume, arguments.certificate)
+        if "colouringsInCollection" in results:
+            print("\ncolourings in collection: " + str(results["colouringsInCollection"]))
+            print("B2-Colourings: " + str(results["B2Colourings"]))
+            print("B3-Colourings: " + str(results["B3Colourings"]))
+            print("self adjacent not present: " + str(results["selfAdjacentNotPresent"]))
+            print("edges not present: " + str(results["edgesNotPresent"]))
+        if arguments.decide:
+            print("\nverdict: " + str(results["verdict"]) + ", missing: " + str(results["missingClass"]))
+        if arguments.metrics:
+            print("metrics: " + json.dumps(metrics["stages"]))
+    else:
+        jobs = []
+        if arguments.graph is not None:
+            if arguments.all_paths:
+                jobs.extend(expandJob({"graph": arguments.graph, "path": "all"}))
+            elif len(arguments.path) != 3:
+                parser.error("a path of three vertices is needed")
+            elif arguments.path not in admissiblePaths(predefinedGraphs[arguments.graph]):
+                parser.error("the vertices " + " ".join(str(v) for v in arguments.path) + " are not a path of " + arguments.graph
+                             + " that can be removed to make a block")
+            else:
+                jobs.append({"graph": arguments.graph, "path": arguments.path, "crossed": arguments.crossed})
+
+#       the jobs of files are read while the first jobs are analysed, so large files do not have to fit in memory
+        jobs = iter(jobs)
+        if arguments.jobs is not None:
+            jobs = itertools.chain(jobs, readJobsFile(arguments.jobs, expandPairedJob if arguments.paired else expandJob))
+        if arguments.graph6 is not None:
+            jobs = itertools.chain(jobs, readGraph6Jobs(arguments.graph6))
+        if arguments.paired:
+            jobs = pairJobs(jobs)
+        firstJobs = list(itertools.islice(jobs, 2))
+        jobs = itertools.chain(firstJobs, jobs)
+        if arguments.certificate is not None and len(firstJobs) > 1:
+            parser.error("--certificate needs a single block")
+
+        if len(firstJobs) > 1 and arguments.workers > 1:
+            with ProcessPoolExecutor(arguments.workers) as executor:
+                if arguments.paired:
+                    results = analyseJobs(executor, jobs, 2*arguments.workers, analyseJobPair, arguments.cache, arguments.graph_directory,
+                                          arguments.metrics, arguments.decide, 1, arguments.resume, arguments.checkpoint_interval)
+                else:
+                    results = analyseJobs(executor, jobs, 2*arguments.workers, analyseJob, arguments.cache, arguments.graph_directory,
+                                          arguments.metrics, arguments.decide, arguments.snark, 1, arguments.resume,
+                                          arguments.checkpoint_interval)
+                for result in results:
+                    for line in (result if arguments.paired else [result]):
+                        print(json.dumps(line), flush=True)
+        else:
+            for job in jobs:
+                if arguments.paired:
+                    pairResults = analyseJobPair(job, arguments.cache, arguments.graph_directory, arguments.metrics, arguments.decide,
+                                                 arguments.workers, arguments.resume, arguments.checkpoint_interval)
+                    for result in pairResults:
+                        print(json.dumps(result), flush=True)
+                else:
+                    result = analyseJob(job, arguments.cache, arguments.graph_directory, arguments.metrics, arguments.decide, arguments.snark,
+                                        arguments.workers, arguments.resume, arguments.checkpoint_interval, arguments.certificate)
+                    print(json.dumps(result), flush=True)
@@ -0,0 +1,189 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import LoupekineColourings
+
+# the blocks which are benchmarked. "expected" is the summary given for the block in the README, or None if the README has none.
+# the analysis of a "slow" block takes a lot longer than the others, so it is only benchmarked when asked for
+benchmarkBlocks = [
+    {"name": "petersenCrossed", "graph": "petersenGraph", "path": [2, 0, 3], "crossed": True, "slow": False,
+     "expected": {"colouringsInCollection": 648, "B2Colourings": 444, "B3Colourings": 204,
+                  "selfAdjacentNotPresent": [], "edgesNotPresent": []}},
+    {"name": "petersenUncrossed", "graph": "petersenGraph", "path": [2, 0, 3], "crossed": False, "slow": False,
+     "expected": {"colouringsInCollection": 560, "B2Colourings": 444, "B3Colourings": 116,
+                  "selfAdjacentNotPresent": ["102", "201"], "edgesNotPresent": ["102-102", "102-201", "201-201"]}},
+    {"name": "firstBlanusa", "graph": "firstBlanusaSnark", "path": [0, 9, 6], "crossed": False, "slow": False,
+     "expected": {"colouringsInCollection": 671, "B2Colourings": 365, "B3Colourings": 306,
+                  "selfAdjacentNotPresent": ["012", "021", "102", "120", "201", "210"],
+                  "edgesNotPresent": ["012-012", "012-021", "012-102", "012-120", "012-201", "012-210", "021-021", "021-102", "021-120",
+                                      "021-201", "021-210", "102-102", "102-120", "102-201", "102-210", "120-120", "120-201", "120-210",
+                                      "201-201", "201-210", "210-210"]}},
+    {"name": "flowerJ5", "graph": "flowerSnarkJ5", "path": [1, 0, 2], "crossed": False, "slow": True, "expected": None},
+]
+
+# the functions of LoupekineColourings which are timed separately. a function which is called more than once during the analysis
+# of a block, like createColouringsGraph, is timed over all its calls together
+benchmarkStages = ["createBlock", "createB12Colourings", "createBColourings", "createColouringsGraph", "createB2Colourings", "createB3Colourings", "createTriangleGraph"]
+
+# Input: the name of a function of LoupekineColourings, the dictionary in which the measurements are kept, and whether to measure the memory
+# Output: the function wrapped such that the wall time of each call, and if asked the peak memory used during it, are added to the measurements
+def timedStage(name, measurements, measureMemory):
+    function = getattr(LoupekineColourings, name)
+
+    def timedFunction(*arguments, **keywordArguments):
+        if measureMemory:
+            startMemory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = function(*arguments, **keywordArguments)
+        wallTime = time.perf_counter() - start
+
+        stage = measurements.setdefault(name, {"calls": 0, "wallTime": 0.0, "peakMemory": None})
+        stage["calls"] += 1
+        stage["wallTime"] += wallTime
+        if measureMemory:
+            peakMemory = tracemalloc.get_traced_memory()[1] - startMemory
+            stage["peakMemory"] = max(stage["peakMemory"] or 0, peakMemory)
+        return result
+
+    return timedFunction
+
+# Input: a block from benchmarkBlocks and whether to measure the memory
+# Output: the measurements of each stage for the analysis of the block, its total wall time, the summary made by analyseBlock,
+#         and the stages of the metrics recorded by analyseBlock
+#         the stages are measured by replacing the functions in LoupekineColourings while the block is analysed, so the analysis
+#         is exactly the one of analyseBlock
+def measureBlock(block, measureMemory):
+    measurements = {}
+    functions = {}
+    for name in benchmarkStages:
+        functions[name] = getattr(LoupekineColourings, name)
+        setattr(LoupekineColourings, name, timedStage(name, measurements, measureMemory))
+
+    metrics = LoupekineColourings.createMetrics()
+    if measureMemory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        summary = LoupekineColourings.analyseBlock(LoupekineColourings.createJobBlock(block), metrics=metrics)
+        totalTime = time.perf_counter() - start
+    finally:
+        if measureMemory:
+            tracemalloc.stop()
+        for name in functions:
+            setattr(LoupekineColourings, name, functions[name])
+
+    return measurements, totalTime, summary, metrics["stages"]
+
+# Input: a block from benchmarkBlocks, the amount of times to time it, and whether to measure the memory
+# Output: a dictionary with for each stage the amount of calls, the smallest wall time over all repetitions and the peak memory in bytes,
+#         the smallest total wall time, the summary of the analysis, whether it matches the expected summary, and the metrics of the first run.
+#         the memory is measured in a separate run, since tracing the memory slows down the analysis
+def benchmarkBlock(block, repeat, measureMemory):
+    stages = {}
+    totalTime = None
+    summaries = []
+    metrics = None
+    for i in range(repeat):
+        measurements, runTime, summary, runMetrics = measureBlock(block, False)
+        summaries.append(summary)
+        if metrics is None:
+            metrics = runMetrics
+        if totalTime is None or runTime < totalTime:
+            totalTime = runTime
+        for name in measurements:
+            if name not in stages or measurements[name]["wallTime"] < stages[name]["wallTime"]:
+                stages[name] = measurements[name]
+
+    if measureMemory:
+        measurements, runTime, summary, runMetrics = measureBlock(block, True)
+        summaries.append(summary)
+        for name in measurements:
+            stages[name]["peakMemory"] = measurements[name]["peakMemory"]
+
+    correct = None
+    if block["expected"] is not None:
+        correct = all(summary == block["expected"] for summary in summaries)
+
+    return {"stages": stages, "totalWallTime": totalTime, "summary": summaries[0], "matchesReference": correct, "metrics": metrics}
+
+# Input: the results of two runs of the benchmark
+# Output: none, the wall times and peak memory of each stage in both runs are printed, with the ratio of the new run to the old one
+def compareResults(oldResults, newResults):
+    for name in newResults["blocks"]:
+        if name not in oldResults["blocks"]:
+            continue
+        oldBlock = oldResults["blocks"][name]
+        newBlock = newResults["blocks"][name]
+        print(name + ":")
+        for stage in benchmarkStages + ["total"]:
+            if stage == "total":
+                oldStage = {"wallTime": oldBlock["totalWallTime"], "peakMemory": None}
+                newStage = {"wallTime": newBlock["totalWallTime"], "peakMemory": None}
+            elif stage in oldBlock["stages"] and stage in newBlock["stages"]:
+                oldStage = oldBlock["stages"][stage]
+                newStage = newBlock["stages"][stage]
+            else:
+                continue
+
+            line = "  " + stage.ljust(24) + "{:10.3f}s {:10.3f}s {:7.2f}x".format(oldStage["wallTime"], newStage["wallTime"],
+                                                                                 newStage["wallTime"] / max(oldStage["wallTime"], 1e-9))
+            if oldStage["peakMemory"] is not None and newStage["peakMemory"] is not None:
+                line += "  {:10.1f}MB {:10.1f}MB".format(oldStage["peakMemory"] / 2**20, newStage["peakMemory"] / 2**20)
+            print(line)
+        if oldBlock["summary"] != newBlock["summary"]:
+            print("  the summary changed")
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time each stage of the analysis of the predefined blocks, measure their peak memory, "
+                                                 "and check the results against the outputs given in the README.")
+    parser.add_argument("blocks", nargs="*", help="the names of the blocks to benchmark, all blocks which are not slow if none are given: "
+                                                  + ", ".join(block["name"] + (" (slow)" if block["slow"] else "") for block in benchmarkBlocks))
+    parser.add_argument("--all", action="store_true", help="benchmark all blocks, also the slow ones")
+    parser.add_argument("--repeat", type=int, default=1, help="the amount of times to time each block, the fastest time of each stage is kept")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure the peak memory, which needs an extra slower run of each block")
+    parser.add_argument("--output", metavar="FILE", help="a file to save the results in as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="a file with results saved by an earlier run to compare with")
+    arguments = parser.parse_args()
+
+    blocks = [block for block in benchmarkBlocks if arguments.all or not block["slow"]]
+    if arguments.blocks:
+        names = [block["name"] for block in benchmarkBlocks]
+        for name in arguments.blocks:
+            if name not in names:
+                parser.error("unknown block " + name)
+        blocks = [block for block in benchmarkBlocks if block["name"] in arguments.blocks]
+
+    results = {"python": sys.version.split()[0], "platform": platform.platform(), "time": time.strftime("%Y-%m-%d %H:%M:%S"), "blocks": {}}
+    allCorrect = True
+    for block in blocks:
+        print(block["name"] + "...", flush=True)
+        blockResults = benchmarkBlock(block, arguments.repeat, not arguments.no_memory)
+        results["blocks"][block["name"]] = blockResults
+        for stage in benchmarkStages:
+            if stage in blockResults["stages"]:
+                measurements = blockResults["stages"][stage]
+                line = "  " + stage.ljust(24) + "{:10.3f}s".format(measurements["wallTime"])
+                if measurements["peakMemory"] is not None:
+                    line += "  {:10.1f}MB".format(measurements["peakMemory"] / 2**20)
+                print(line)
+        print("  " + "total".ljust(24) + "{:10.3f}s".format(blockResults["totalWallTime"]))
+        if blockResults["matchesReference"] is False:
+            allCorrect = False
+            print("  the summary does not match the README: " + json.dumps(blockResults["summary"]))
+
+    if arguments.output is not None:
+        with open(arguments.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=1)
+    if arguments.compare is not None:
+        with open(arguments.compare) as compareFile:
+            compareResults(json.load(compareFile), results)
+
+    if not allCorrect:
+        sys.exit(1)
@@ -0,0 +1,212 @@
+import argparse
+import gzip
+import json
+import sys
+
+# the kinds of B^2- and B^3-colourings by the colours of their spokes, and the kinds of edges between them for which the results
+# say whether the final set has one. they are the same as in LoupekineColourings.py, but are written out again here so the
+# verifier does not use any code of the program whose results it checks
+B2Kinds = ["00", "11", "22"]
+B3Kinds = ["012", "021", "102", "120", "201", "210"]
+selfAdjacentKinds = B2Kinds + B3Kinds
+edgeKinds = ([B2Kinds[i] + "-" + t for i in range(3) for t in B2Kinds[i:]] + [s + "-" + t for s in B2Kinds for t in B3Kinds]
+             + [B3Kinds[i] + "-" + t for i in range(6) for t in B3Kinds[i:]])
+
+# the results of the analysis which are computed again from the certificate
+summaryKeys = ["colouringsInCollection", "B2Colourings", "B3Colourings", "selfAdjacentNotPresent", "edgesNotPresent"]
+
+# Input: the kinds of the two colourings of an edge
+# Output: the kinds of the colourings which have to complete a triangle with the edge for conditions (5) and (6), in the order in which
+#         the certificate gives them. between two B^3-colourings with middle spokes coloured 0 all kinds of B^3-colourings are needed,
+#         with middle spokes coloured 0 or 1 those with middle spoke coloured 1 or 2, and otherwise those with middle spoke coloured 2.
+#         every edge needs all kinds of B^2-colourings
+def triangleKinds(s, t):
+    kinds = []
+    if len(s) == 3 and len(t) == 3:
+        for k in B3Kinds:
+            if s[1] == "0" and t[1] == "0" or s[1] in "01" and t[1] in "01" and k[1] in "12" or k[1] == "2":
+                kinds.append(k)
+
+    return kinds + B2Kinds
+
+# Input: the block of the certificate, a dictionary with "vertices", the amount of vertices, and "edges", a list of pairs of vertices
+# Output: none, an error is raised if the block is not a cubic graph with a spoke as its first edge and four semiedges as its last
+#         edges, whose ends of degree 1 are the last five vertices
+def checkBlock(block):
+    vertexAmount = block["vertices"]
+    edges = block["edges"]
+    degrees = [0] * vertexAmount
+    for u, v in edges:
+        if not 0 <= u < v < vertexAmount:
+            raise ValueError("the block has an edge " + str([u, v]) + " which is not a pair of different vertices")
+        degrees[u] += 1
+        degrees[v] += 1
+
+    boundary = [0, len(edges)-4, len(edges)-3, len(edges)-2, len(edges)-1]
+    for i in range(len(edges)):
+        if (i in boundary) != (edges[i][1] >= vertexAmount - 5) or edges[i][0] >= vertexAmount - 5:
+            raise ValueError("the edge " + str(edges[i]) + " of the block is not where a block has its spoke and semiedges")
+    for v in range(vertexAmount):
+        if degrees[v] != (1 if v >= vertexAmount - 5 else 3):
+            raise ValueError("the vertex " + str(v) + " of the block has degree " + str(degrees[v]))
+
+# Input: the block of the certificate and the amount of blocks k
+# Output: a dictionary with the edges of B^k in the order of the colourings of the certificate: the spokes, the internal edges of each
+#         copy, the edges connecting the right semiedges of each copy to the left semiedges of the next, and the left and right semiedges
+#         of B^k. it also has for each vertex the positions of the edges incident with it, and the amount of blocks
+def createCombinedBlock(block, k):
+    edges = block["edges"]
+    internal = block["vertices"] - 5
+    boundary = [0, len(edges)-4, len(edges)-3, len(edges)-2, len(edges)-1]
+    spoke, left0, left1, right0, right1 = [edges[i][0] for i in boundary]
+
+    combinedEdges = []
+    for j in range(k):
+        combinedEdges.append([spoke + j*internal, k*internal + 4 + j])
+    for j in range(k):
+        for i in range(len(edges)):
+            if i not in boundary:
+                combinedEdges.append([edges[i][0] + j*internal, edges[i][1] + j*internal])
+    for j in range(k-1):
+        combinedEdges.append([right0 + j*internal, left0 + (j+1)*internal])
+        combinedEdges.append([right1 + j*internal, left1 + (j+1)*internal])
+    combinedEdges.append([left0, k*internal])
+    combinedEdges.append([left1, k*internal + 1])
+    combinedEdges.append([right0 + (k-1)*internal, k*internal + 2])
+    combinedEdges.append([right1 + (k-1)*internal, k*internal + 3])
+
+    incidentEdges = [[] for v in range(k*internal + 4 + k)]
+    for i in range(len(combinedEdges)):
+        for v in combinedEdges[i]:
+            incidentEdges[v].append(i)
+
+    return {"edges": combinedEdges, "incidentEdges": incidentEdges, "blocks": k}
+
+# Input: a colouring of the certificate as a string of colours and the graph B^k it colours
+# Output: the kind of the colouring, and for its left and right semiedges the colour of the semiedge and the set of colours of the
+#         two edges adjacent to it, as a bitmask. an error is raised if the colouring is not a normal 5-edge-colouring of B^k
+#         whose spokes are coloured as one of the kinds
+def checkColouring(colouring, Bk):
+    colours = [ord(c) - ord("0") for c in colouring]
+    if len(colours) != len(Bk["edges"]) or min(colours) < 0 or max(colours) > 4:
+        raise ValueError("the colouring " + colouring + " does not give one of 5 colours to every edge of B^" + str(Bk["blocks"]))
+
+#   the mask of the colours at each vertex, which has 3 colours at a vertex of degree 3 if the colouring is proper
+    vertexMasks = []
+    for incident in Bk["incidentEdges"]:
+        mask = 0
+        for e in incident:
+            mask |= 1 << colours[e]
+        if len(incident) == 3 and bin(mask).count("1") != 3:
+            raise ValueError("the colouring " + colouring + " is not proper")
+        vertexMasks.append(mask)
+
+#   an edge between two vertices of degree 3 is normal if its ends together have 3 or 5 colours
+    for u, v in Bk["edges"]:
+        if len(Bk["incidentEdges"][u]) == 3 and len(Bk["incidentEdges"][v]) == 3:
+            if bin(vertexMasks[u] | vertexMasks[v]).count("1") == 4:
+                raise ValueError("the colouring " + colouring + " is not normal at the edge " + str([u, v]))
+
+    kind = colouring[:Bk["blocks"]]
+    if kind not in selfAdjacentKinds:
+        raise ValueError("the colouring " + colouring + " has spokes coloured " + kind)
+
+    semiedges = []
+    for e in range(len(Bk["edges"]) - 4, len(Bk["edges"])):
+        semiedges.append((colours[e], vertexMasks[Bk["edges"][e][0]] & ~(1 << colours[e])))
+    return kind, semiedges
+
+# Input: a certificate written by writeCertificate in LoupekineColourings.py
+# Output: the results computed from the certificate. an error is raised if one of its colourings is not normal, if an edge joins
+#         two colourings whose combined colouring is not normal, or if a colouring given to complete a triangle of an edge for
+#         conditions (5) and (6) is not of the right kind or does not have the edges of the triangle. every colouring and edge is
+#         checked once and the edges are kept in a set, so the time is linear in the size of the certificate
+def verifyCertificate(certificate):
+    checkBlock(certificate["block"])
+    combinedBlocks = {2: createCombinedBlock(certificate["block"], 2), 3: createCombinedBlock(certificate["block"], 3)}
+    colourings = certificate["colourings"]
+    offsets = certificate["offsets"]
+    targets = certificate["targets"]
+    witnesses = certificate["witnesses"]
+    colouringAmount = len(colourings)
+
+    kinds = []
+    semiedges = []
+    for colouring in colourings:
+        Bk = combinedBlocks[2] if len(colouring) == len(combinedBlocks[2]["edges"]) else combinedBlocks[3]
+        kind, colouringSemiedges = checkColouring(colouring, Bk)
+        kinds.append(kind)
+        semiedges.append(colouringSemiedges)
+
+    if len(offsets) != colouringAmount + 1 or offsets[0] != 0 or offsets[-1] != len(targets):
+        raise ValueError("the offsets do not give a row of edges for each colouring")
+    edges = set()
+    for v in range(colouringAmount):
+        if offsets[v] > offsets[v+1]:
+            raise ValueError("the offsets do not give a row of edges for each colouring")
+        for w in targets[offsets[v]:offsets[v+1]]:
+            if not 0 <= w < colouringAmount:
+                raise ValueError("the edge from colouring " + str(v) + " goes to " + str(w) + ", which is not a colouring")
+            edges.add(v * colouringAmount + w)
+
+#   the right semiedges of the first colouring of an edge are joined to the left semiedges of the second, which have to get the same colours
+#   and give a normal edge, so the two sets of colours adjacent to it have 0 or 2 colours in common
+    for v in range(colouringAmount):
+        for w in targets[offsets[v]:offsets[v+1]]:
+            for right, left in [(semiedges[v][2], semiedges[w][0]), (semiedges[v][3], semiedges[w][1])]:
+                if right[0] != left[0] or bin(right[1] & left[1]).count("1") == 1:
+                    raise ValueError("the edge from colouring " + str(v) + " to " + str(w) + " does not give a normal colouring")
+
+    position = 0
+    for v in range(colouringAmount):
+        for w in targets[offsets[v]:offsets[v+1]]:
+            for kind in triangleKinds(kinds[v], kinds[w]):
+                if position == len(witnesses):
+                    raise ValueError("there are not enough colourings to complete the triangles of all edges")
+                x = witnesses[position]
+                position += 1
+                if not 0 <= x < colouringAmount or kinds[x] != kind or v * colouringAmount + x not in edges or x * colouringAmount + w not in edges:
+                    raise ValueError("the edge from colouring " + str(v) + " to " + str(w) + " has no triangle with a colouring of kind " + kind)
+    if position != len(witnesses):
+        raise ValueError("there are more colourings to complete triangles than needed")
+
+#   the results count the colourings with an edge from them, and look for the kinds of colourings attaching to themselves and of edges
+    selfAdjacent = set()
+    edgesPresent = set()
+    colouringsInCollection = [v for v in range(colouringAmount) if offsets[v] != offsets[v+1]]
+    for v in range(colouringAmount):
+        for w in targets[offsets[v]:offsets[v+1]]:
+            if v == w:
+                selfAdjacent.add(kinds[v])
+            edgesPresent.add(kinds[v] + "-" + kinds[w])
+
+    return {"colouringsInCollection": len(colouringsInCollection),
+            "B2Colourings": len([v for v in colouringsInCollection if len(kinds[v]) == 2]),
+            "B3Colourings": len([v for v in colouringsInCollection if len(kinds[v]) == 3]),
+            "selfAdjacentNotPresent": [kind for kind in selfAdjacentKinds if kind not in selfAdjacent],
+            "edgesNotPresent": [kind for kind in edgeKinds if kind not in edgesPresent]}
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check a certificate written by LoupekineColourings.py --certificate: that its colourings are "
+                                                 "normal, that the colourings joined by its edges attach, and that every edge has the triangles "
+                                                 "of conditions (5) and (6). The results are computed again from the certificate and compared "
+                                                 "with the results it gives.")
+    parser.add_argument("certificate", help="the certificate file")
+    arguments = parser.parse_args()
+
+    with gzip.open(arguments.certificate, "rt") as certificateFile:
+        certificate = json.load(certificateFile)
+    try:
+        results = verifyCertificate(certificate)
+    except ValueError as error:
+        print("the certificate is not valid: " + str(error))
+        sys.exit(1)
+
+    print(json.dumps(results))
+    for key in summaryKeys:
+        if results[key] != certificate["results"][key]:
+            print("the certificate is valid, but its results give " + json.dumps(certificate["results"][key]) + " for " + key)
+            sys.exit(1)
+    print("the certificate is valid and gives the same results")